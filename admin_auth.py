@@ -0,0 +1,26 @@
+"""Access control for the admin routes and bulk exports."""
+import functools
+import hmac
+import os
+from flask import jsonify, request
+
+# Token required in the X-Admin-Token header of admin requests; unset refuses them all
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+def is_admin_request():
+    """Whether the request carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+
+
+def admin_required(view):
+    """Answer 403 unless the request carries the admin token."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({"error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
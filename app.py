@@ -1,16 +1,93 @@
-from flask import Flask
+import logging
+import os
+import time
+from flask import Flask, Response, jsonify, request
 from home import home_bp
-from online_courses import online_courses_bp
-from credit_details import credit_details_bp
+from admin_auth import admin_required
+import online_courses
+import credit_details
+import blended_courses
+from online_courses import online_courses_bp, suggestion_cache, suggestion_flights
+from credit_details import credit_details_bp, credit_summary_cache
 from blended_courses import blended_courses_bp
+from credit_audit import credit_audit_bp, credit_audit_command
+import data_reload
+import data_store
+import http_cache
+import instrumentation
+import matcher_pool
+import registry
+from data_snapshot import build_data_command
+from workbook_loader import load_report_command
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+log = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.cli.add_command(build_data_command)
+app.cli.add_command(credit_audit_command)
+app.cli.add_command(load_report_command)
+instrumentation.init_app(app)
+http_cache.init_app(app)
 
 # Register Blueprints
 app.register_blueprint(home_bp)
 app.register_blueprint(online_courses_bp)
 app.register_blueprint(credit_details_bp)
 app.register_blueprint(blended_courses_bp)
+app.register_blueprint(credit_audit_bp)
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Expose workbook and result cache counters for load testing."""
+    stats = data_store.cache_stats()
+    stats["credit_summaries"] = credit_summary_cache.stats()
+    stats["suggestions"] = dict(suggestion_cache.stats(), coalesced=suggestion_flights.coalesced)
+    stats["responses"] = http_cache.response_cache.stats()
+    stats["matcher_pool"] = matcher_pool.pool_stats()
+    return jsonify(stats)
+
+def cache_metrics():
+    """Cache counters as flat gauges for /metrics."""
+    metrics = {f"workbook_cache_{name}": value for name, value in data_store.cache_stats().items()}
+    metrics.update({f"credit_summary_cache_{name}": value for name, value in credit_summary_cache.stats().items()})
+    metrics.update({f"suggestion_cache_{name}": value for name, value in suggestion_cache.stats().items()})
+    metrics["suggestion_cache_coalesced"] = suggestion_flights.coalesced
+    metrics.update({f"response_cache_{name}": value for name, value in http_cache.response_cache.stats().items()})
+    return metrics
+
+instrumentation.register_collector(cache_metrics)
+
+@app.route('/metrics')
+def metrics():
+    """Request and phase latency histograms plus cache gauges, in Prometheus text format."""
+    return Response(instrumentation.render_metrics(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/admin/reload', methods=['GET', 'POST'])
+@admin_required
+def admin_reload():
+    """Report the data generation being served; POST first rebuilds it from any workbooks that changed."""
+    if request.method == 'POST' and not data_reload.reload(force=True) and data_reload.status()["last_error"]:
+        return jsonify(data_reload.status()), 422
+    return jsonify(data_reload.status())
+
+def warm_up():
+    """Load every workbook and build all indexes, so the first requests don't pay for it.
+
+    gunicorn calls this in the master when preloading (see gunicorn.conf.py),
+    so forked workers start with the indexes already in shared memory.
+    """
+    started = time.perf_counter()
+    # Parse the watched sheets together first; the indexes then read them from the cache
+    data_store.preload(data_reload.watched_sheets())
+    registry.warm_up()
+    online_courses.warm_up()
+    credit_details.warm_up()
+    blended_courses.warm_up()
+    log.info("Data indexes built in %.2fs", time.perf_counter() - started)
+
+data_reload.init_app(app, rebuild=warm_up)
 
 if __name__ == '__main__':
     app.run(debug=True)
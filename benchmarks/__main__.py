@@ -0,0 +1,132 @@
+"""Benchmark every endpoint and the core matching/credit functions.
+
+Run from the repository root:
+
+    python -m benchmarks                          # real workbooks in data/
+    python -m benchmarks --synthetic              # 50k students, 5k aliases
+    python -m benchmarks --compare old.json       # flag p95 regressions
+
+Results are written as JSON (benchmarks/results/ by default) so runs can be
+compared over time.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from benchmarks import suite
+from benchmarks.synthetic import build_synthetic_data
+
+RESULTS_DIR = os.path.join(suite.REPO_ROOT, "benchmarks", "results")
+
+
+def _in_fresh_process(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(func, *args).result()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=suite.REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current, tolerance):
+    """Print p95 changes against an earlier run; return the names that regressed."""
+    regressions = []
+    rows = [("endpoints", name, "latency_ms") for name in current["endpoints"]]
+    rows += [("micro", name, "latency_us") for name in current["micro"]]
+    for section, name, field in rows:
+        before = previous.get(section, {}).get(name)
+        after = current[section][name]
+        if not before:
+            continue
+        old, new = before[field]["p95"], after[field]["p95"]
+        change = (new - old) / old if old else 0.0
+        flag = "  REGRESSION" if change > tolerance else ""
+        print(f"{name:28} p95 {old:10.3f} -> {new:10.3f} ({change:+.0%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", action="store_true", help="generate larger synthetic workbooks")
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--aliases", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=300, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads per endpoint")
+    parser.add_argument("--micro-calls", type=int, default=500)
+    parser.add_argument("--only", nargs="*", choices=suite.SCENARIOS, help="endpoint scenarios to run")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench-data-") as scratch:
+        root = suite.REPO_ROOT
+        if args.synthetic:
+            started = time.perf_counter()
+            build_synthetic_data(scratch, students=args.students, aliases=args.aliases)
+            root = scratch
+            print(f"Generated synthetic workbooks in {time.perf_counter() - started:.1f}s")
+
+        results = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "dataset": "synthetic" if args.synthetic else "data/",
+                "students": args.students if args.synthetic else None,
+                "aliases": args.aliases if args.synthetic else None,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+            },
+            "endpoints": {},
+            "micro": {},
+        }
+
+        # Requests are drawn up front so the workbooks read for them don't count towards peak RSS
+        workload = suite.Workload(os.path.join(root, "data"))
+        for scenario in args.only or suite.SCENARIOS:
+            requests = suite.scenario_requests(workload, scenario, args.requests)
+            result = _in_fresh_process(suite.run_scenario, root, scenario, requests, args.concurrency)
+            results["endpoints"][scenario] = result
+            latency = result["latency_ms"]
+            print(f"{scenario:28} p50 {latency['p50']:9.2f}ms  p95 {latency['p95']:9.2f}ms  "
+                  f"p99 {latency['p99']:9.2f}ms  {result['throughput_rps']:9.1f} req/s  "
+                  f"rss {result['peak_rss_mb']} MiB")
+
+        if args.micro_calls:
+            calls = suite.micro_benchmark_calls(workload, args.micro_calls)
+            results["micro"] = _in_fresh_process(suite.run_micro_benchmarks, root, calls)
+            for name, result in results["micro"].items():
+                latency = result["latency_us"]
+                print(f"{name:28} p50 {latency['p50']:9.1f}µs  p95 {latency['p95']:9.1f}µs  "
+                      f"{result['ops_per_s']:9.1f} ops/s")
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
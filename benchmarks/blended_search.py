@@ -0,0 +1,95 @@
+"""Latency of blended-course catalog searches as the catalog grows.
+
+Run from the repository root:
+
+    python -m benchmarks.blended_search
+    python -m benchmarks.blended_search --sizes 3000 30000 300000
+
+Each size builds a CatalogIndex over synthetic courses spread across
+departments, platforms and credit values, then times a mix of title
+prefixes, code prefixes, filters and credit ranges, each followed by a
+second page.
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks.synthetic import CATEGORIES, course_names
+from catalog_index import CatalogIndex, tokenize
+
+DEPARTMENTS = ["Computer Science and Engineering", "Information Technology", "Mechanical Engineering",
+               "Civil Engineering", "Electronics and Communication Engineering", "Biomedical Engineering"]
+PLATFORMS = ["NPTEL", "COURSERA", "Udemy", "EdX"]
+
+
+def synthetic_courses(size, seed=7):
+    rng = random.Random(seed)
+    names = course_names(size, seed)
+    courses = []
+    for number in range(size):
+        # course_names runs out of distinct titles; larger catalogs number the repeats ("... 2", "... 3")
+        repeat = number // len(names)
+        name = names[number % len(names)] + (f" {repeat + 1}" if repeat else "")
+        online = rng.random() < 0.2
+        courses.append({
+            "course_name": name,
+            "course_code_R2024": f"{rng.choice('ABCDEFGH')}{rng.choice('ABCDEFGH')}{number:05d}",
+            "course_code_R2019": f"19{rng.choice('ABCDEFGH')}{number:05d}",
+            "department": rng.choice(DEPARTMENTS),
+            "category": rng.choice(CATEGORIES),
+            "platform": rng.choice(PLATFORMS) if online else None,
+            "credits": float(rng.choice([1, 2, 3, 3, 4])),
+            "course_type": "Theory",
+        })
+    return courses
+
+
+def _searches(courses, count, seed=7):
+    rng = random.Random(seed)
+    searches = []
+    for course in rng.sample(courses, min(count, len(courses))):
+        words = tokenize(course["course_name"])
+        kind = rng.randrange(4)
+        if kind == 0:
+            searches.append({"query": " ".join(word[:rng.randint(2, len(word))] for word in words[:2])})
+        elif kind == 1:
+            searches.append({"code": course["course_code_R2024"][:rng.randint(2, 5)]})
+        elif kind == 2:
+            searches.append({"query": words[0][:3], "filters": {"department": [course["department"]]}})
+        else:
+            searches.append({"filters": {"platform": PLATFORMS[:2]}, "min_credits": 3, "max_credits": 4})
+    return searches
+
+
+def _latency_ms(catalog, searches):
+    samples = []
+    for search in searches:
+        started = time.perf_counter()
+        numbers = catalog.search(**search)
+        page, more = catalog.page(numbers, limit=20)
+        if more:
+            catalog.page(numbers, after=page[-1], limit=20)
+        catalog.facet_counts(numbers)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.blended_search", description=__doc__.splitlines()[0])
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[3000, 30000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'courses':>8} {'build s':>8} {'p50':>8} {'p95':>8}  (ms)")
+    for size in args.sizes:
+        courses = synthetic_courses(size)
+        started = time.perf_counter()
+        catalog = CatalogIndex(courses, "benchmark")
+        build_seconds = time.perf_counter() - started
+        p50, p95 = _latency_ms(catalog, _searches(courses, args.searches))
+        print(f"{len(catalog):8d} {build_seconds:8.2f} {p50:8.2f} {p95:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Throughput of the RapidFuzz matching layer against fuzzywuzzy on the real alias set.
+
+Run from the repository root:
+
+    python -m benchmarks.fuzzy_matching
+
+fuzzywuzzy is no longer a dependency of the app; install it to get the
+baseline numbers and the equivalence check.
+"""
+import random
+import time
+from course_matcher import ELIGIBILITY_THRESHOLD, PARTIAL_RATIO_THRESHOLD, get_alias_index
+from fuzzy_match import ChoiceSet
+
+try:
+    from fuzzywuzzy import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+
+def _queries(aliases, count=200, seed=7):
+    rng = random.Random(seed)
+    queries = []
+    for alias in rng.sample(aliases, count):
+        # A mix of full aliases and half-typed prefixes, as /autocomplete sees them
+        queries.append(alias if rng.random() < 0.5 else alias[:rng.randint(1, len(alias))])
+    return queries
+
+
+def _timed(func, queries):
+    started = time.perf_counter()
+    results = [func(query) for query in queries]
+    elapsed = time.perf_counter() - started
+    return results, len(queries) / elapsed
+
+
+def main():
+    aliases = get_alias_index().aliases
+    queries = _queries(aliases)
+    choices = ChoiceSet(aliases)
+    eligibility_choices = ChoiceSet(aliases, force_ascii=True)
+    print(f"{len(aliases)} aliases, {len(queries)} queries")
+
+    new_extract, new_rate = _timed(
+        lambda q: choices.extract(q, limit=5, threshold=PARTIAL_RATIO_THRESHOLD), queries)
+    new_best, new_wratio_rate = _timed(
+        lambda q: eligibility_choices.best_wratio([q], ELIGIBILITY_THRESHOLD)[0], queries)
+    started = time.perf_counter()
+    batch_best = eligibility_choices.best_wratio(queries, ELIGIBILITY_THRESHOLD)
+    batch_rate = len(queries) / (time.perf_counter() - started)
+
+    print(f"partial_ratio top-5   rapidfuzz: {new_rate:10.1f} queries/s")
+    print(f"WRatio best match     rapidfuzz: {new_wratio_rate:10.1f} queries/s")
+    print(f"WRatio best (batched) rapidfuzz: {batch_rate:10.1f} queries/s")
+
+    if process is None:
+        print("fuzzywuzzy not installed; skipping baseline")
+        return
+
+    def old_extract(query):
+        matches = process.extract(query, aliases, limit=5, scorer=fuzz.partial_ratio)
+        return [(alias, score) for alias, score in matches if score > PARTIAL_RATIO_THRESHOLD]
+
+    def old_best(query):
+        match = process.extractOne(query, aliases)
+        return match[1] if match and match[1] >= ELIGIBILITY_THRESHOLD else None
+
+    old_extract_results, old_rate = _timed(old_extract, queries)
+    old_best_results, old_wratio_rate = _timed(old_best, queries)
+
+    print(f"partial_ratio top-5  fuzzywuzzy: {old_rate:10.1f} queries/s ({new_rate / old_rate:.1f}x)")
+    print(f"WRatio best match    fuzzywuzzy: {old_wratio_rate:10.1f} queries/s ({new_wratio_rate / old_wratio_rate:.1f}x)")
+    print(f"identical partial_ratio results: {old_extract_results == new_extract}")
+    print(f"identical WRatio results:        {old_best_results == new_best == batch_best}")
+
+
+if __name__ == "__main__":
+    main()
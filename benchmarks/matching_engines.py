@@ -0,0 +1,108 @@
+"""Recall and latency of the character n-gram engine against the combined matcher.
+
+Run from the repository root:
+
+    python -m benchmarks.matching_engines
+    python -m benchmarks.matching_engines --sizes 1000 10000 50000
+
+Recall@5 treats the combined engine's results (word TF-IDF plus
+partial_ratio, what /autocomplete serves by default) on the aliases in
+data/ as the reference; since those include loose partial_ratio matches,
+it also reports how often each engine finds the course a query was made
+from. Latency is then measured on synthetic alias lists of growing size,
+since the real one is only about a thousand aliases long.
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks.synthetic import course_aliases, course_names
+from course_matcher import (AliasIndex, NgramIndex, build_ngram_arrays, combined_matches, get_alias_index,
+                            get_ngram_index, ngram_matches)
+
+
+def _queries(aliases, count, seed=7):
+    """(query, alias it was made from): full aliases, half-typed prefixes, abbreviated words ("mach learn") and typos."""
+    rng = random.Random(seed)
+    queries = []
+    for alias in rng.sample(aliases, min(count, len(aliases))):
+        query = alias
+        kind = rng.randrange(4)
+        if kind == 1:
+            query = alias[:rng.randint(3, max(3, len(alias)))]
+        elif kind == 2:
+            query = " ".join(word[:rng.randint(3, 5)] for word in alias.split())
+        elif kind == 3 and len(alias) > 4:
+            position = rng.randrange(1, len(alias) - 2)
+            query = alias[:position] + alias[position + 1] + alias[position] + alias[position + 2:]
+        queries.append((query, alias))
+    return queries
+
+
+def recall_at_5(queries, alias_index, ngram_index):
+    """Mean share of the combined engine's results found in the n-gram engine's top 5.
+
+    Also counts, for each engine, the queries whose source course is among
+    its results (anywhere for the unordered combined results, in the top 5
+    for the n-gram engine).
+    """
+    recalls = []
+    found_source = {"combined": 0, "ngram": 0}
+    for query, alias in queries:
+        source = set(alias_index.standard_names(alias))
+        reference = set(combined_matches(alias_index, query))
+        top_5 = set(ngram_matches(ngram_index, query)[:5])
+        found_source["combined"] += bool(source & reference)
+        found_source["ngram"] += bool(source & top_5)
+        if reference:
+            recalls.append(len(top_5 & reference) / min(5, len(reference)))
+    return statistics.mean(recalls), found_source
+
+
+def _latency_ms(func, queries):
+    samples = []
+    for query, _ in queries:
+        started = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def synthetic_indexes(size, seed=7):
+    """Alias and n-gram indexes over about `size` synthetic aliases."""
+    rng = random.Random(seed)
+    course_lookup = {}
+    for name in course_names(max(1, size // 8), seed):
+        for alias in course_aliases(name, rng)[:8]:
+            course_lookup.setdefault(alias, []).append(name)
+    aliases = list(course_lookup)
+    alias_index = AliasIndex(aliases, course_lookup, None)
+    return alias_index, NgramIndex(alias_index, build_ngram_arrays(aliases))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.matching_engines", description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 5000, 20000, 50000],
+                        help="synthetic alias counts to time")
+    args = parser.parse_args(argv)
+
+    alias_index = get_alias_index()
+    queries = _queries(alias_index.aliases, args.queries)
+    recall, found_source = recall_at_5(queries, alias_index, get_ngram_index())
+    print(f"{len(alias_index.aliases)} aliases in data/, {len(queries)} queries")
+    print(f"recall@5 against the combined engine: {recall:.3f}")
+    print(f"source course found: combined {found_source['combined']}, n-gram top 5 {found_source['ngram']}")
+
+    print(f"{'aliases':>8} {'combined p50':>13} {'p95':>8} {'ngram p50':>10} {'p95':>8}  (ms)")
+    for size in args.sizes:
+        alias_index, ngram_index = synthetic_indexes(size)
+        queries = _queries(alias_index.aliases, args.queries)
+        combined = _latency_ms(lambda query: combined_matches(alias_index, query), queries)
+        ngram = _latency_ms(lambda query: ngram_matches(ngram_index, query), queries)
+        print(f"{len(alias_index.aliases):8d} {combined[0]:13.2f} {combined[1]:8.2f} {ngram[0]:10.2f} {ngram[1]:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
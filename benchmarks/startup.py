@@ -0,0 +1,93 @@
+"""Startup budgets: app import time, warm-up time and first-request latency.
+
+Run from the repository root:
+
+    python -m benchmarks.startup
+
+Every measurement runs in a fresh interpreter, as a new gunicorn worker
+would. First requests are measured both cold (no warm-up, as under
+`flask run`) and after warm_up() (as in a preloaded gunicorn worker). Exits
+non-zero when a median is over its budget.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from benchmarks.suite import REPO_ROOT
+
+# Budgets in seconds for the import and warm-up, milliseconds for requests
+IMPORT_BUDGET = 1.0
+WARM_UP_BUDGET = 5.0
+COLD_FIRST_REQUEST_BUDGET_MS = 3000.0
+WARM_FIRST_REQUEST_BUDGET_MS = 50.0
+
+FIRST_REQUESTS = {
+    "online_courses": ("POST", "/online_courses", {"reg_no": "212223230232", "course_name": "Deep Learning"}),
+    "autocomplete": ("GET", "/autocomplete?query=machine+lear&reg_no=212223230232", None),
+    "credit_details": ("POST", "/credit_details", {"reg_no": "212223230232"}),
+}
+
+_CHILD = """
+import gc, json, logging, sys, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - started
+warm_up_seconds = None
+if sys.argv[1] == "warm":
+    started = time.perf_counter()
+    app.warm_up()
+    warm_up_seconds = time.perf_counter() - started
+    # As gunicorn.conf.py does after preloading
+    gc.freeze()
+method, url, body = json.loads(sys.argv[2])
+client = app.app.test_client()
+started = time.perf_counter()
+client.open(url, method=method, json=body).get_data()
+first_request_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"import": import_seconds, "warm_up": warm_up_seconds, "first_request_ms": first_request_ms}))
+"""
+
+
+def measure(mode, request):
+    output = subprocess.run([sys.executable, "-c", _CHILD, mode, json.dumps(request)], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per measurement")
+    parser.add_argument("--output", help="write the medians as JSON")
+    args = parser.parse_args(argv)
+
+    checks = []
+    results = {}
+    for name, request in FIRST_REQUESTS.items():
+        for mode in ("cold", "warm"):
+            runs = [measure(mode, request) for _ in range(args.runs)]
+            results[f"{name}_{mode}"] = {key: statistics.median(run[key] for run in runs)
+                                         for key in runs[0] if runs[0][key] is not None}
+            budget = COLD_FIRST_REQUEST_BUDGET_MS if mode == "cold" else WARM_FIRST_REQUEST_BUDGET_MS
+            checks.append((f"first {name} request ({mode})", results[f"{name}_{mode}"]["first_request_ms"], budget, "ms"))
+
+    imports = [result["import"] for result in results.values()]
+    warm_ups = [result["warm_up"] for result in results.values() if "warm_up" in result]
+    checks.insert(0, ("import app", statistics.median(imports), IMPORT_BUDGET, "s"))
+    checks.insert(1, ("warm_up()", statistics.median(warm_ups), WARM_UP_BUDGET, "s"))
+
+    over_budget = False
+    for label, value, budget, unit in checks:
+        status = "ok" if value <= budget else "OVER BUDGET"
+        over_budget |= value > budget
+        print(f"{label:36} {value:10.3f}{unit:2}  budget {budget:8.1f}{unit:2}  {status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
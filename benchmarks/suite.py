@@ -0,0 +1,248 @@
+"""Endpoint load tests and micro-benchmarks, run against a data root.
+
+Each scenario runs in a fresh process whose working directory is the data
+root (every module resolves data/ from the working directory at import), so
+peak RSS and first-request latency are measured per endpoint.
+"""
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoint scenarios in the order they are reported
+SCENARIOS = [
+    "home",
+    "blended_courses",
+    "blended_courses_search",
+    "online_courses_student",
+    "online_courses_eligibility",
+    "online_courses_batch",
+    "autocomplete",
+    "autocomplete_uncached",
+    "credit_details",
+    "get_completed_courses",
+]
+
+MICRO_BENCHMARKS = ["match_course_name", "check_course_eligibility", "compute_earned_credits"]
+
+CATEGORIES = ["HS", "BS", "ES", "PC", "PE", "OE", "EEC", "MC"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Discard whatever is written to stdout inside the block, without buffering it in memory."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def latency_summary(samples, scale):
+    """Percentiles of a list of durations in seconds, scaled to ms (1e3) or µs (1e6)."""
+    samples = np.asarray(samples) * scale
+    return {
+        "p50": round(float(np.percentile(samples, 50)), 3),
+        "p95": round(float(np.percentile(samples, 95)), 3),
+        "p99": round(float(np.percentile(samples, 99)), 3),
+        "mean": round(float(samples.mean()), 3),
+    }
+
+
+class Workload:
+    """Register numbers, course names and queries drawn from the workbooks under data/."""
+
+    def __init__(self, data_dir, seed=7):
+        rng = random.Random(seed)
+        students = pd.read_excel(os.path.join(data_dir, "student_credits.xlsx"), sheet_name=None)
+        reg_nos = []
+        self.course_cells = []
+        for df in students.values():
+            df.columns = df.columns.str.strip().str.upper()
+            if "REGISTER NUMBER" not in df.columns:
+                continue
+            reg_nos += df["REGISTER NUMBER"].astype(str).str.strip().tolist()
+            categories = [col for col in CATEGORIES if col in df.columns]
+            self.course_cells += [list(cells) for cells in df[categories].itertuples(index=False, name=None)]
+        self.reg_nos = [reg_no for reg_no in reg_nos if len(reg_no) == 12 and reg_no.isdigit()]
+
+        # Every department the eligibility check knows about, whatever the student sheets hold
+        self.eligibility_reg_nos = [f"2122{year}{dept}{serial:04d}" for year in ("21", "23", "24")
+                                    for dept in ("23", "24", "10", "11", "01", "22") for serial in range(3)]
+
+        scoft = pd.read_excel(os.path.join(data_dir, "updateddata3.xlsx"), sheet_name="Online Courses(SCOFT)")
+        self.course_names = scoft["Course_Title"].dropna().astype(str).tolist()
+
+        mldata = pd.read_excel(os.path.join(data_dir, "mldata.xlsx"))
+        aliases = [alias for cell in mldata["Aliases"].dropna() for alias in str(cell).split(", ")]
+        # Half-typed prefixes and whole aliases, as keystrokes arrive
+        self.queries = [alias[:rng.randint(3, max(3, len(alias)))] for alias in aliases]
+        rng.shuffle(self.queries)
+        self.rng = rng
+
+    def pick(self, values):
+        return values[self.rng.randrange(len(values))]
+
+
+def _requests(scenario, workload, count):
+    """Yield (method, url, json_body) tuples for a scenario."""
+    rng = workload.rng
+    for i in range(count):
+        if scenario == "home":
+            yield "GET", "/", None
+        elif scenario == "blended_courses":
+            yield "GET", "/blended_courses", None
+        elif scenario == "blended_courses_search":
+            yield "GET", f"/blended_courses/search?{urlencode({'q': workload.pick(workload.queries)})}", None
+        elif scenario == "online_courses_student":
+            yield "POST", "/online_courses", {"reg_no": workload.pick(workload.eligibility_reg_nos)}
+        elif scenario == "online_courses_eligibility":
+            yield "POST", "/online_courses", {"reg_no": workload.pick(workload.eligibility_reg_nos),
+                                              "course_name": workload.pick(workload.course_names)}
+        elif scenario == "online_courses_batch":
+            pairs = [{"reg_no": workload.pick(workload.eligibility_reg_nos),
+                      "course_name": workload.pick(workload.course_names)} for _ in range(50)]
+            yield "POST", "/online_courses/batch", {"pairs": pairs}
+        elif scenario in ("autocomplete", "autocomplete_uncached"):
+            # Popular prefixes repeat across users, so draw from a skewed distribution
+            query = workload.queries[min(int(rng.paretovariate(1.2)) - 1, len(workload.queries) - 1)] \
+                if scenario == "autocomplete" else workload.queries[i % len(workload.queries)]
+            params = urlencode({"query": query, "reg_no": workload.pick(workload.eligibility_reg_nos)})
+            yield "GET", f"/autocomplete?{params}", None
+        elif scenario == "credit_details":
+            yield "POST", "/credit_details", {"reg_no": workload.pick(workload.reg_nos)}
+        elif scenario == "get_completed_courses":
+            yield "POST", "/get_completed_courses", {"reg_no": workload.pick(workload.reg_nos),
+                                                     "category": rng.choice(CATEGORIES)}
+
+
+def _send(client, method, url, body):
+    response = client.open(url, method=method, json=body)
+    response.get_data()
+    return response.status_code
+
+
+def scenario_requests(workload, scenario, count):
+    """The requests of a scenario: one untimed warm-up followed by `count` timed ones."""
+    return list(_requests(scenario, workload, count + 1))
+
+
+def micro_benchmark_calls(workload, count):
+    """Arguments for each micro-benchmark, drawn from the workload."""
+    return {
+        "match_course_name": [(workload.pick(workload.queries),) for _ in range(count)],
+        "check_course_eligibility": [(workload.pick(workload.eligibility_reg_nos), workload.pick(workload.course_names))
+                                     for _ in range(count)],
+        "compute_earned_credits": [(workload.pick(workload.course_cells), "23") for _ in range(count)],
+    }
+
+
+def run_scenario(root, scenario, requests, concurrency=1):
+    """Load-test one endpoint scenario from inside a fresh process."""
+    os.chdir(root)
+    sys.path.insert(0, REPO_ROOT)
+    with _quiet():
+        started = time.perf_counter()
+        from app import app
+        import online_courses
+        import_seconds = time.perf_counter() - started
+
+        uncached = scenario == "autocomplete_uncached"
+        client = app.test_client()
+
+        started = time.perf_counter()
+        first_status = _send(client, *requests[0])
+        first_request = time.perf_counter() - started
+
+    latencies = []
+    statuses = []
+    lock = threading.Lock()
+    pending = iter(requests[1:])
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                request = next(pending, None)
+            if request is None:
+                return
+            if uncached:
+                online_courses.suggestion_cache.clear()
+            started = time.perf_counter()
+            status = _send(client, *request)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses.append(status)
+
+    with _quiet():
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "status_counts": {str(status): statuses.count(status) for status in sorted(set(statuses + [first_status]))},
+        "import_seconds": round(import_seconds, 3),
+        "first_request_ms": round(first_request * 1e3, 3),
+        "latency_ms": latency_summary(latencies, 1e3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_micro_benchmarks(root, calls_by_name):
+    """Time the matching and credit functions directly, bypassing HTTP and result caches."""
+    os.chdir(root)
+    sys.path.insert(0, REPO_ROOT)
+    with _quiet():
+        from app import warm_up
+        from course_matcher import match_course_name
+        from online_courses import check_course_eligibility
+        from credit_details import compute_earned_credits
+
+        functions = {
+            "match_course_name": match_course_name,
+            "check_course_eligibility": check_course_eligibility,
+            "compute_earned_credits": compute_earned_credits,
+        }
+
+        # Build every department's indexes outside the timed loops
+        warm_up()
+        results = {}
+        for name in MICRO_BENCHMARKS:
+            func, calls = functions[name], calls_by_name[name]
+            timings = []
+            for args in calls:
+                started = time.perf_counter()
+                func(*args)
+                timings.append(time.perf_counter() - started)
+            results[name] = {
+                "calls": len(timings),
+                "latency_us": latency_summary(timings, 1e6),
+                "ops_per_s": round(len(timings) / sum(timings), 1),
+            }
+    return results
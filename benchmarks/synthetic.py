@@ -0,0 +1,154 @@
+"""Synthetic workbooks shaped like the ones in data/, at a configurable scale.
+
+The generated directory can stand in for data/ (see benchmarks.suite), so
+every loader and endpoint runs unchanged against, for example, 50k students
+and 5k course aliases.
+"""
+import os
+import random
+import shutil
+import pandas as pd
+
+REAL_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+CATEGORIES = ["HS", "BS", "ES", "PC", "PE", "OE", "EEC", "MC"]
+
+# Department sheets of updateddata3.xlsx read by the eligibility check
+PC_SHEETS = ["AIDS-PC", "AIML-PC", "CS-PC", "IOT-PC", "CSE-34-PC", "CSE-12-PC", "IT-34-PC", "IT-12-PC"]
+
+# The only department whose student and curriculum sheets both exist in data/
+STUDENT_SHEET = "aids_courses"
+CURRICULUM_SHEET = "R2019-AI&DS"
+DEPARTMENT_CODE = "23"
+
+_PREFIXES = ["Introduction to", "Advanced", "Applied", "Foundations of", "Principles of", "Topics in",
+             "Modern", "Practical", "Computational", "Essentials of"]
+_SUBJECTS = ["Machine Learning", "Data Science", "Cloud Computing", "Computer Networks", "Operating Systems",
+             "Database Systems", "Cyber Security", "Deep Learning", "Computer Vision", "Signal Processing",
+             "Graph Theory", "Compiler Design", "Distributed Systems", "Internet of Things", "Robotics",
+             "Natural Language Processing", "Software Testing", "Quantum Computing", "Embedded Systems",
+             "Information Retrieval", "Game Theory", "Cryptography", "Data Mining", "Web Technology",
+             "Reinforcement Learning", "Parallel Computing", "Human Computer Interaction", "Big Data Analytics",
+             "Blockchain", "Digital Electronics", "Control Systems", "Probability and Statistics",
+             "Linear Algebra", "Optimization", "Computer Graphics", "Mobile Computing", "Edge Computing",
+             "Wireless Networks", "Bioinformatics", "Speech Processing"]
+_SUFFIXES = ["", " Laboratory", " for Engineers", " and Applications", " Systems", " Design"]
+
+
+def course_names(count, seed=7):
+    """Return `count` distinct, realistic-looking course titles."""
+    rng = random.Random(seed)
+    names = [f"{prefix} {subject}{suffix}" for prefix in _PREFIXES for subject in _SUBJECTS for suffix in _SUFFIXES]
+    rng.shuffle(names)
+    if count > len(names):
+        names += [f"{name} {part}" for part in ("II", "III", "IV") for name in names][:count - len(names)]
+    return names[:count]
+
+
+def course_aliases(name, rng):
+    """Abbreviations and rewordings of a course title, as mldata.xlsx lists them."""
+    words = name.split()
+    initials = "".join(word[0] for word in words if word[0].isupper())
+    core = " ".join(words[1:]) if len(words) > 2 else name
+    candidates = [
+        initials,
+        name.lower(),
+        f"Intro to {core}",
+        f"{core} Basics",
+        f"Adv {core}",
+        f"Fundamentals of {core}",
+        " ".join(word[:4] for word in words),
+        f"{initials} Course",
+        f"{core} ({initials})",
+        f"Learn {core}",
+    ]
+    rng.shuffle(candidates)
+    return list(dict.fromkeys(candidates))
+
+
+def build_mldata(path, alias_count, seed=7):
+    """Write mldata.xlsx with roughly `alias_count` aliases; return the standard names."""
+    rng = random.Random(seed)
+    names = course_names(max(1, alias_count // 8), seed)
+    rows = []
+    for name in names:
+        aliases = course_aliases(name, rng)[:8]
+        rows.append({
+            "Standard Course Name": name,
+            "Aliases": ", ".join(aliases[:4]),
+            "Aliases1": ", ".join(aliases[4:]),
+        })
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return names
+
+
+def build_updateddata(path, names, seed=7):
+    """Write updateddata3.xlsx: department PC sheets plus the SCOFT online course list."""
+    rng = random.Random(seed)
+    with pd.ExcelWriter(path) as writer:
+        for sheet in PC_SHEETS:
+            titles = rng.sample(names, min(len(names), 60))
+            pd.DataFrame({"Category": "PC", "Course Title": titles}).to_excel(writer, sheet_name=sheet, index=False)
+        pd.DataFrame({
+            "S.No.": range(1, len(names) + 1),
+            "Department": "SCOFT",
+            "Course Code R2024": [f"24SC{i:04d}" for i in range(len(names))],
+            "Course Code R2019": [f"19SC{i:04d}" for i in range(len(names))],
+            "Platform": [rng.choice(["NPTEL", "Coursera", "edX"]) for _ in names],
+            "Course_Title": names,
+            "Course Duration    (Minimum 12 weeks)": [f"{rng.choice([12, 8, 4])} weeks" for _ in names],
+            "Credits": [rng.choice([1, 2, 3]) for _ in names],
+            "LINKS": [f"https://example.org/course/{i}" for i in range(len(names))],
+        }).to_excel(writer, sheet_name="Online Courses(SCOFT)", index=False)
+
+
+def build_curriculum(path, course_count=180, seed=7):
+    """Write curriculum.xlsx (header on the second row) and return the curriculum rows."""
+    rng = random.Random(seed)
+    titles = course_names(course_count, seed + 1)
+    curriculum = pd.DataFrame({
+        "Category": [CATEGORIES[i % len(CATEGORIES)] for i in range(course_count)],
+        "Course Code R2024": [f"24CU{i:04d}" for i in range(course_count)],
+        "Course Code R2019": [f"19CU{i:04d}" for i in range(course_count)],
+        "Course Title": titles,
+        "Theory Credits": [rng.choice([0, 2, 3]) for _ in titles],
+        "Practical Credits": [rng.choice([0, 1, 2]) for _ in titles],
+    })
+    curriculum["Total Credits"] = curriculum["Theory Credits"] + curriculum["Practical Credits"]
+    with pd.ExcelWriter(path) as writer:
+        curriculum.to_excel(writer, sheet_name=CURRICULUM_SHEET, index=False, startrow=1)
+    return curriculum
+
+
+def build_student_credits(path, curriculum, student_count, seed=7):
+    """Write student_credits.xlsx with `student_count` students; return their register numbers."""
+    rng = random.Random(seed)
+    by_category = curriculum.groupby("Category")["Course Title"].apply(list).to_dict()
+    reg_nos = []
+    rows = []
+    for i in range(student_count):
+        college, serial = divmod(i, 10000)
+        reg_no = f"{2100 + college:04d}{rng.choice(['21', '22', '23', '24'])}{DEPARTMENT_CODE}{serial:04d}"
+        reg_nos.append(reg_no)
+        row = {"REGISTER NUMBER": int(reg_no), "NAME": f"student {i}"}
+        for category in CATEGORIES:
+            titles = by_category.get(category, [])
+            taken = rng.sample(titles, rng.randint(0, min(len(titles), 6)))
+            # Mimic hand-typed sheets: varied case and spacing around commas
+            row[category] = ", ".join(title if rng.random() < 0.7 else title.lower() for title in taken)
+        rows.append(row)
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name=STUDENT_SHEET, index=False)
+    return reg_nos
+
+
+def build_synthetic_data(root, students=50000, aliases=5000, seed=7):
+    """Create <root>/data with synthetic workbooks; credits.xlsx is copied from the real data."""
+    data_dir = os.path.join(root, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    names = build_mldata(os.path.join(data_dir, "mldata.xlsx"), aliases, seed)
+    build_updateddata(os.path.join(data_dir, "updateddata3.xlsx"), names, seed)
+    curriculum = build_curriculum(os.path.join(data_dir, "curriculum.xlsx"), seed=seed)
+    build_student_credits(os.path.join(data_dir, "student_credits.xlsx"), curriculum, students, seed)
+    shutil.copy(os.path.join(REAL_DATA_DIR, "credits.xlsx"), os.path.join(data_dir, "credits.xlsx"))
+    return data_dir
@@ -1,7 +1,181 @@
-from flask import Blueprint
+from flask import Blueprint, jsonify, request
+import hashlib
+import logging
+import os
+import re
+import data_reload
+import data_store
+from catalog_index import FACETS, CatalogIndex
+from instrumentation import phase
+from result_cache import VersionedCache
 
 blended_courses_bp = Blueprint('blended_courses', __name__)
+log = logging.getLogger(__name__)
+
+EXCEL_PATH = os.path.join(os.getcwd(), "data", "updateddata3.xlsx")
+
+# Results per page by default, and the most a client may ask for
+BLENDED_PAGE_SIZE = int(os.environ.get("BLENDED_PAGE_SIZE", "20"))
+BLENDED_MAX_PAGE_SIZE = int(os.environ.get("BLENDED_MAX_PAGE_SIZE", "100"))
+
+# Department course sheets of updateddata3.xlsx and the department each
+# belongs to; "Online Courses" names the department per row instead
+CATALOG_SHEETS = {
+    "AGRI_Mapped": "Agricultural Engineering",
+    "AGRI- LE ": "Agricultural Engineering",
+    "BME -Mapped": "Biomedical Engineering",
+    "BME-LE": "Biomedical Engineering",
+    "Civil - Mapped": "Civil Engineering",
+    "civil-LE": "Civil Engineering",
+    "CHEMICAL - Mapped": "Chemical Engineering",
+    "CHEMICAL -LE ": "Chemical Engineering",
+    "AIDS - Mapped": "Artificial Intelligence and Data Science (AI&DS)",
+    "AIML - Mapped": "Artificial Intelligence and Machine Learning (AIML)",
+    "Cyber Security(CS) - Mapped": "CSE (Cyber Security)",
+    "IOT - Mapped": "CSE (Internet of Things)",
+    "CSE - Mapped, III & IV Years": "Computer Science and Engineering",
+    "CSE - II Years": "Computer Science and Engineering",
+    "IT - Mapped III & IV Years": "Information Technology",
+    "IT - II Years": "Information Technology",
+    "EIE": "Electronics and Instrumentation Engineering",
+    "EIE-LE": "Electronics and Instrumentation Engineering",
+    "EEE - Mapped": "Electrical and Electronics Engineering",
+    "EEE-LE": "Electrical and Electronics Engineering",
+    "ECE - Mapped": "Electronics and Communication Engineering",
+    "ECE-LE": "Electronics and Communication Engineering",
+    "MECH - Mapped": "Mechanical Engineering",
+    "MECH-LE": "Mechanical Engineering",
+    "MED ELEC": "Medical Electronics",
+    " MED ELEC - LE": "Medical Electronics",
+    "Online Courses": None,
+}
+
+data_reload.watch(EXCEL_PATH, list(CATALOG_SHEETS), ["Course Title"])
+
+_catalogs = VersionedCache()
+
+# "Course Code - R24", "Course Code \nR2019" and the like
+_COURSE_CODE_COLUMN = re.compile(r"^course code\s*-?\s*r(?:20)?(19|24)$", re.IGNORECASE)
+
+
+def _column_name(column):
+    name = " ".join(str(column).split())
+    code = _COURSE_CODE_COLUMN.match(name)
+    if code:
+        return f"Course Code R20{code.group(1)}"
+    if name.startswith("Platform"):
+        return "Platform"
+    return name
+
+
+def _text(value):
+    """A cell as trimmed single-spaced text, or None when it's empty, NaN or a "-" placeholder."""
+    if not isinstance(value, str):
+        if value is None or value != value:
+            return None
+        value = str(value)
+    value = " ".join(value.split())
+    return value if value and value != "-" else None
+
+
+def _credits(value):
+    try:
+        credits = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if credits != credits else credits
+
+
+def load_catalog_courses():
+    """Every course of the catalog sheets, once per (department, title, codes)."""
+    courses = {}
+    for sheet_name, department in CATALOG_SHEETS.items():
+        try:
+            df = data_store.read_excel(EXCEL_PATH, sheet_name=sheet_name)
+        except ValueError as e:
+            log.warning(f"Skipping blended course sheet '{sheet_name}': {e}")
+            continue
+        df.columns = [_column_name(column) for column in df.columns]
+        df = df.loc[:, ~df.columns.duplicated()]
+        for row in df.to_dict("records"):
+            course_name = _text(row.get("Course Title"))
+            # Repeated header rows and the signature rows at the foot of a sheet
+            if course_name is None or course_name == "Course Title":
+                continue
+            course = {
+                "course_name": course_name,
+                "course_code_R2024": _text(row.get("Course Code R2024")),
+                "course_code_R2019": _text(row.get("Course Code R2019")),
+                "department": department or _text(row.get("Department")),
+                "category": _text(row.get("Category")),
+                "platform": _text(row.get("Platform")),
+                "credits": _credits(row.get("Credits")),
+                "course_type": _text(row.get("Course Type")),
+            }
+            if not (course["course_code_R2024"] or course["course_code_R2019"] or course["credits"] is not None):
+                continue
+            key = (course["department"], course_name.lower(), course["course_code_R2024"], course["course_code_R2019"])
+            courses.setdefault(key, course)
+    return list(courses.values())
+
+
+def get_catalog():
+    """The blended-course search index for the current updateddata3.xlsx."""
+    signature = data_reload.file_signature(EXCEL_PATH)
+    version = hashlib.sha1(repr(signature).encode()).hexdigest()[:8]
+    return _catalogs.get("catalog", signature, lambda: CatalogIndex(load_catalog_courses(), version))
+
+
+def warm_up():
+    """Build the catalog index before the first search."""
+    get_catalog()
+
+
+def _parse_cursor(cursor, catalog):
+    """Course number a cursor points after, or None if it is malformed or from another data version."""
+    version, _, number = cursor.partition("-")
+    if version != catalog.version or not number.isdigit():
+        return None
+    return int(number)
+
 
 @blended_courses_bp.route('/blended_courses')
 def blended_courses():
     return "<h2>Blended Courses Page</h2>"
+
+
+@blended_courses_bp.route('/blended_courses/search', methods=['GET'])
+def search_blended_courses():
+    """Search the blended-course catalog by title words and code prefix, with facet filters and cursor paging.
+
+    Query parameters: q, code, department, category, platform (each
+    repeatable), min_credits, max_credits, limit and cursor (the
+    next_cursor of the previous page).
+    """
+    try:
+        limit = min(max(request.args.get('limit', BLENDED_PAGE_SIZE, type=int), 1), BLENDED_MAX_PAGE_SIZE)
+        min_credits = request.args.get('min_credits', type=float)
+        max_credits = request.args.get('max_credits', type=float)
+        filters = {facet: request.args.getlist(facet) for facet in FACETS if request.args.getlist(facet)}
+
+        with phase("index_lookup"):
+            catalog = get_catalog()
+            cursor = request.args.get('cursor')
+            after = _parse_cursor(cursor, catalog) if cursor else None
+            if cursor and after is None:
+                return jsonify({"error": "The course list has changed since this page was fetched. Please search again."}), 400
+
+            numbers = catalog.search(request.args.get('q', ''), request.args.get('code'), filters,
+                                     min_credits, max_credits)
+            page, more = catalog.page(numbers, after, limit)
+            response = {
+                "total": len(numbers),
+                "courses": [catalog.courses[number] for number in page],
+                "next_cursor": f"{catalog.version}-{page[-1]}" if more else None,
+                "facets": catalog.facet_counts(numbers),
+            }
+        return jsonify(response)
+
+    except Exception as e:
+        log.error(f"Error in search_blended_courses: {e}")
+        return jsonify({"error": "Unable to search blended courses"}), 500
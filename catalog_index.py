@@ -0,0 +1,123 @@
+"""Search index over the blended-course catalog.
+
+Courses are numbered in title order, so every posting list (the sorted
+array of course numbers containing a token or facet value) is already in
+result order, and a page cursor is simply the last course number served.
+Search terms and course codes are matched as prefixes against sorted
+vocabularies, filters intersect per-value posting lists, and the credit
+range is a slice of the courses sorted by credits.
+"""
+import bisect
+import re
+import numpy as np
+
+# Fields results can be filtered and counted on
+FACETS = ("department", "category", "platform")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lower-cased alphanumeric words of a title or query."""
+    return _TOKEN.findall(text.lower())
+
+
+def _posting(numbers):
+    return np.unique(np.asarray(numbers, dtype=np.int32))
+
+
+class PrefixIndex:
+    """Posting lists of a sorted vocabulary, looked up by prefix."""
+
+    def __init__(self, postings):
+        self.vocabulary = sorted(postings)
+        self.postings = [_posting(postings[token]) for token in self.vocabulary]
+
+    def match(self, prefix):
+        """Course numbers with any token starting with `prefix`, sorted."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff", start)
+        if end - start == 1:
+            return self.postings[start]
+        if end == start:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(self.postings[start:end]))
+
+
+class CatalogIndex:
+    """Prefix search, facet filters and counts over a list of course dicts."""
+
+    def __init__(self, courses, version):
+        self.version = version
+        self.courses = sorted(courses, key=lambda course: (course["course_name"].lower(), course["department"] or ""))
+
+        words, codes = {}, {}
+        for number, course in enumerate(self.courses):
+            for token in tokenize(course["course_name"]):
+                words.setdefault(token, []).append(number)
+            for field in ("course_code_R2024", "course_code_R2019"):
+                if course[field]:
+                    codes.setdefault(course[field].upper(), []).append(number)
+                    for token in tokenize(course[field]):
+                        words.setdefault(token, []).append(number)
+        self.words = PrefixIndex(words)
+        self.codes = PrefixIndex(codes)
+
+        # Per facet: sorted values, each course's value position (-1 if none) and a posting list per value
+        self.facet_values = {}
+        self.facet_codes = {}
+        self.facet_postings = {}
+        for facet in FACETS:
+            values = sorted({course[facet] for course in self.courses if course[facet]})
+            positions = {value: position for position, value in enumerate(values)}
+            codes_array = np.array([positions.get(course[facet], -1) for course in self.courses], dtype=np.int32)
+            self.facet_values[facet] = values
+            self.facet_codes[facet] = codes_array
+            self.facet_postings[facet] = {value: np.flatnonzero(codes_array == position).astype(np.int32)
+                                          for position, value in enumerate(values)}
+
+        credits = np.array([np.nan if course["credits"] is None else course["credits"] for course in self.courses])
+        rated = np.flatnonzero(~np.isnan(credits))
+        order = np.argsort(credits[rated], kind="stable")
+        self.credit_order = rated[order].astype(np.int32)
+        self.credit_sorted = credits[rated][order]
+
+    def __len__(self):
+        return len(self.courses)
+
+    def search(self, query="", code=None, filters=None, min_credits=None, max_credits=None):
+        """Sorted numbers of the courses matching every query term (as a prefix), code prefix and filter.
+
+        `filters` maps a facet to the values allowed for it.
+        """
+        matches = None
+
+        def narrow(numbers):
+            return numbers if matches is None else np.intersect1d(matches, numbers, assume_unique=True)
+
+        for term in sorted(set(tokenize(query)), key=len, reverse=True):
+            matches = narrow(self.words.match(term))
+        if code:
+            matches = narrow(self.codes.match(code.strip().upper()))
+        for facet, values in (filters or {}).items():
+            postings = [self.facet_postings[facet][value] for value in values if value in self.facet_postings[facet]]
+            matches = narrow(np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int32))
+        if min_credits is not None or max_credits is not None:
+            start = 0 if min_credits is None else np.searchsorted(self.credit_sorted, min_credits, side="left")
+            end = len(self.credit_sorted) if max_credits is None else np.searchsorted(self.credit_sorted, max_credits, side="right")
+            matches = narrow(np.sort(self.credit_order[start:end]))
+        return np.arange(len(self.courses), dtype=np.int32) if matches is None else matches
+
+    def facet_counts(self, numbers):
+        """{facet: {value: matching courses}} for a search result, leaving out values with none."""
+        counts = {}
+        for facet in FACETS:
+            codes = self.facet_codes[facet][numbers]
+            tally = np.bincount(codes[codes >= 0], minlength=len(self.facet_values[facet]))
+            counts[facet] = {value: int(count) for value, count in zip(self.facet_values[facet], tally) if count}
+        return counts
+
+    def page(self, numbers, after=None, limit=20):
+        """Up to `limit` course numbers of a search result following course number `after`, and whether more follow."""
+        start = 0 if after is None else int(np.searchsorted(numbers, after, side="right"))
+        return numbers[start:start + limit].tolist(), start + limit < len(numbers)
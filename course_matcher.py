@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+import numpy as np
+import data_plane
+import data_reload
+import data_store
+from data_plane import decode_strings, encode_strings
+from fuzzy_match import ChoiceSet
+from instrumentation import phase
+from result_cache import VersionedCache
+
+log = logging.getLogger(__name__)
+
+MLDATA_PATH = os.path.join(os.getcwd(), "data", "mldata.xlsx")
+
+# Matching thresholds, overridable through the environment
+TFIDF_THRESHOLD = float(os.environ.get("MATCH_TFIDF_THRESHOLD", "0.5"))
+PARTIAL_RATIO_THRESHOLD = float(os.environ.get("MATCH_PARTIAL_RATIO_THRESHOLD", "60"))
+ELIGIBILITY_THRESHOLD = float(os.environ.get("MATCH_ELIGIBILITY_THRESHOLD", "87"))
+
+# Engine behind match_course_name: "combined" (word TF-IDF plus partial_ratio)
+# or "ngram" (character n-gram TF-IDF, see NgramIndex)
+MATCH_ENGINE = os.environ.get("MATCH_ENGINE", "combined")
+NGRAM_RANGE = (3, 4)
+NGRAM_THRESHOLD = float(os.environ.get("MATCH_NGRAM_THRESHOLD", "0.3"))
+NGRAM_TOP_K = int(os.environ.get("MATCH_NGRAM_TOP_K", "10"))
+NGRAM_MAX_DF = 0.05
+NGRAM_MIN_POSTINGS = 100
+
+# Columns of mldata.xlsx the alias index reads
+ALIAS_COLUMNS = ("Standard Course Name", "Aliases", "Aliases1")
+data_reload.watch(MLDATA_PATH, [0], ALIAS_COLUMNS, usecols=ALIAS_COLUMNS)
+
+
+# CountVectorizer's default tokenization: lower-case words of two or more characters
+_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def analyze(text):
+    """Split text into terms exactly as scikit-learn's default CountVectorizer does."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def char_ngrams(text):
+    """Character n-grams of each lower-cased word padded with spaces, like scikit-learn's "char_wb" analyzer."""
+    min_n, max_n = NGRAM_RANGE
+    ngrams = []
+    for word in text.lower().split():
+        word = f" {word} "
+        for n in range(min_n, max_n + 1):
+            if n >= len(word):
+                # A word no longer than n counts once, as itself
+                ngrams.append(word)
+                break
+            ngrams.extend(word[start:start + n] for start in range(len(word) - n + 1))
+    return ngrams
+
+
+def build_alias_arrays(aliases):
+    """Term counts of every alias and their IDF statistics, as plain arrays for the data plane."""
+    # scikit-learn and scipy are imported here, not at module load, so
+    # starting the app doesn't pay for them until an index is built
+    from scipy.sparse import diags
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    # Raw term counts are kept (rather than a fitted TF-IDF matrix) so the
+    # IDF can be adjusted per query exactly as if the query had been part
+    # of the corpus, which is how these scores were originally computed.
+    vectorizer = CountVectorizer()
+    alias_matrix = vectorizer.fit_transform(aliases).tocsc().astype(float)
+    n_docs = len(aliases) + 1
+    doc_freq = np.diff(alias_matrix.indptr)
+    idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+    weighted = alias_matrix @ diags(idf)
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    term_blob, term_offsets = encode_strings(terms)
+    alias_blob, alias_offsets = encode_strings(aliases)
+    return {
+        "aliases": alias_blob,
+        "alias_offsets": alias_offsets,
+        "data": alias_matrix.data,
+        "indices": alias_matrix.indices,
+        "indptr": alias_matrix.indptr,
+        "doc_freq": doc_freq,
+        "idf": idf,
+        "alias_norms_sq": np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel(),
+        "terms": term_blob,
+        "term_offsets": term_offsets,
+    }
+
+
+class AliasIndex:
+    """Prebuilt TF-IDF index over every course alias in mldata.xlsx.
+
+    The numeric parts come from build_alias_arrays, usually as read-only
+    views of a memory-mapped data plane shared by all workers.
+    """
+
+    def __init__(self, aliases, course_lookup, signature, alias_to_standard=None, standard_to_aliases=None, arrays=None):
+        self.aliases = aliases
+        self.course_lookup = course_lookup
+        # Version of mldata.xlsx the index was built from
+        self.signature = signature
+        # Lower-cased lookups used by the eligibility check
+        self.alias_to_standard = alias_to_standard or {}
+        self.standard_to_aliases = standard_to_aliases or {}
+        self.fuzzy_choices = ChoiceSet(aliases)
+
+        self.alias_matrix = None
+        if aliases:
+            from scipy.sparse import csc_matrix
+
+            if arrays is None:
+                arrays = build_alias_arrays(aliases)
+            terms = decode_strings(arrays["terms"], arrays["term_offsets"])
+            self.vocabulary = {term: column for column, term in enumerate(terms)}
+            self.alias_matrix = csc_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                           shape=(len(aliases), len(terms)))
+            self.n_docs = len(aliases) + 1
+            self.doc_freq = arrays["doc_freq"]
+            self.idf = arrays["idf"]
+            self.alias_norms_sq = arrays["alias_norms_sq"]
+
+    def similarity(self, query):
+        """Cosine similarity of the query against every alias, one sparse product over the query terms."""
+        counts = Counter(analyze(query))
+        columns = [self.vocabulary[term] for term in counts if term in self.vocabulary]
+        query_counts = np.array([counts[term] for term in counts if term in self.vocabulary], dtype=float)
+        oov_count = sum(count for term, count in counts.items() if term not in self.vocabulary)
+
+        # The query itself counts as one more document for each of its terms
+        idf = np.log((1 + self.n_docs) / (2 + self.doc_freq[columns])) + 1
+        oov_idf = np.log((1 + self.n_docs) / 2) + 1
+        query_norm = np.sqrt(((query_counts * idf) ** 2).sum() + (oov_count * oov_idf) ** 2)
+        if not columns or not query_norm:
+            return np.zeros(len(self.aliases))
+
+        sub_matrix = self.alias_matrix[:, columns]
+        dots = sub_matrix @ (query_counts * idf * idf)
+        norms_sq = self.alias_norms_sq + sub_matrix.multiply(sub_matrix) @ (idf ** 2 - self.idf[columns] ** 2)
+        norms = np.sqrt(norms_sq)
+        norms[norms == 0] = 1
+        return dots / (norms * query_norm)
+
+    def standard_names(self, alias):
+        return self.course_lookup.get(alias, [])
+
+
+def load_alias_index(path=MLDATA_PATH):
+    """Read mldata.xlsx once and build the alias index."""
+    import pandas as pd
+
+    signature = data_reload.file_signature(path)
+    df = data_store.read_excel(path, usecols=ALIAS_COLUMNS)
+    df.columns = df.columns.str.strip()
+
+    all_names = []
+    course_lookup = {}
+    alias_to_standard = {}  # Maps alias -> standard name
+    standard_to_aliases = {}  # Maps standard name -> set of aliases
+
+    for standard_name, aliases, aliases1 in df[list(ALIAS_COLUMNS)].itertuples(index=False):
+        aliases = aliases.split(', ') if pd.notna(aliases) else []
+        aliases1 = aliases1.split(', ') if pd.notna(aliases1) else []
+
+        merged_aliases = list(set(aliases + aliases1))
+        all_names.extend(merged_aliases)
+
+        for alias in merged_aliases:
+            if alias.strip():
+                course_lookup.setdefault(alias.strip(), []).append(standard_name)
+
+        standard_lower = standard_name.strip().lower()
+        all_aliases = set(aliases + aliases1)
+        all_aliases.add(standard_lower)  # Include standard name itself
+        standard_to_aliases[standard_lower] = all_aliases
+        for alias in all_aliases:
+            alias_to_standard[alias.lower()] = standard_lower
+
+    arrays = None
+    if all_names:
+        # Alias order follows set iteration, which differs between processes,
+        # so the matrix rows are matched to the alias order stored with them.
+        key = {"aliases": hashlib.sha1("\n".join(sorted(all_names)).encode("utf-8")).hexdigest()}
+        arrays = data_plane.load_or_build("alias_index", [path], lambda: build_alias_arrays(all_names), key=key)
+        all_names = decode_strings(arrays["aliases"], arrays["alias_offsets"])
+    return AliasIndex(all_names, course_lookup, signature, alias_to_standard, standard_to_aliases, arrays)
+
+
+def build_ngram_arrays(aliases):
+    """L2-normalized character n-gram TF-IDF vectors of the aliases, in CSC layout for the data plane."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(analyzer=char_ngrams, sublinear_tf=True)
+    matrix = vectorizer.fit_transform(aliases).tocsc()
+    ngrams = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    ngram_blob, ngram_offsets = encode_strings(ngrams)
+    return {
+        "data": matrix.data.astype(np.float32),
+        "indices": matrix.indices.astype(np.int32),
+        "indptr": matrix.indptr.astype(np.int64),
+        "idf": vectorizer.idf_,
+        "ngrams": ngram_blob,
+        "ngram_offsets": ngram_offsets,
+    }
+
+
+class NgramIndex:
+    """Character n-gram TF-IDF vectors of every alias, searched as an inverted index.
+
+    Partial words ("mach learn") share most of their n-grams with the full
+    alias, so one cosine-similarity pass covers both the TF-IDF and the
+    partial_ratio matching. A query only touches the aliases sharing one of
+    its n-grams, not the whole alias list.
+    """
+
+    def __init__(self, alias_index, arrays):
+        self.alias_index = alias_index
+        ngrams = decode_strings(arrays["ngrams"], arrays["ngram_offsets"])
+        self.vocabulary = {ngram: column for column, ngram in enumerate(ngrams)}
+        self.data = arrays["data"]
+        self.indices = arrays["indices"]
+        self.indptr = arrays["indptr"]
+        self.idf = arrays["idf"]
+        self.n_aliases = len(alias_index.aliases)
+
+    def top_k(self, query, k=NGRAM_TOP_K, threshold=NGRAM_THRESHOLD):
+        """(alias position, cosine similarity) of the k best aliases scoring at least threshold, best first."""
+        counts = Counter(ngram for ngram in char_ngrams(query) if ngram in self.vocabulary)
+        if not counts:
+            return []
+        columns = np.array([self.vocabulary[ngram] for ngram in counts])
+        weights = (1 + np.log(np.array(list(counts.values()), dtype=float))) * self.idf[columns]
+        weights /= np.sqrt((weights ** 2).sum())
+
+        # Accumulate over the posting lists of the query's n-grams only.
+        # N-grams in a large share of aliases ("ing", " in") add little to
+        # the ranking but most of the work, so they are skipped.
+        max_postings = max(NGRAM_MIN_POSTINGS, int(self.n_aliases * NGRAM_MAX_DF))
+        scores = np.zeros(self.n_aliases)
+        for column, weight in zip(columns.tolist(), weights.tolist()):
+            start, end = self.indptr[column], self.indptr[column + 1]
+            if end - start > max_postings:
+                continue
+            scores[self.indices[start:end]] += self.data[start:end] * weight
+
+        keep = np.flatnonzero(scores >= threshold)
+        if len(keep) > k:
+            keep = keep[np.argpartition(-scores[keep], k - 1)[:k]]
+        keep = keep[np.lexsort((keep, -scores[keep]))]
+        return list(zip(keep.tolist(), scores[keep].tolist()))
+
+
+def load_ngram_index(alias_index):
+    key = {
+        "aliases": hashlib.sha1("\n".join(alias_index.aliases).encode("utf-8")).hexdigest(),
+        "ngram_range": list(NGRAM_RANGE),
+    }
+    arrays = data_plane.load_or_build("ngram_index", [MLDATA_PATH],
+                                      lambda: build_ngram_arrays(alias_index.aliases), key=key)
+    return NgramIndex(alias_index, arrays)
+
+
+_alias_indexes = VersionedCache()
+_ngram_indexes = VersionedCache()
+
+
+def get_alias_index():
+    """Return the alias index for the mldata.xlsx being served, building it on first use."""
+    return _alias_indexes.get("aliases", data_reload.file_signature(MLDATA_PATH), load_alias_index)
+
+
+def get_ngram_index():
+    """Return the character n-gram index over the served alias index, building it on first use."""
+    alias_index = get_alias_index()
+    if not alias_index.aliases:
+        return None
+    return _ngram_indexes.get("ngrams", alias_index.signature, load_ngram_index, alias_index)
+
+
+def combined_matches(index, input_name):
+    """Standard names of aliases passing word TF-IDF similarity or the top-5 partial_ratio matches."""
+    # TF-IDF Cosine Similarity Matching
+    with phase("tfidf"):
+        similarity = index.similarity(input_name)
+
+        # Lowered similarity threshold for broader matches
+        candidates = np.flatnonzero(similarity >= TFIDF_THRESHOLD)
+        ranked = candidates[np.argsort(-similarity[candidates], kind="stable")]
+
+    matched_courses = []
+    for i in ranked:
+        matched_courses.extend(index.standard_names(index.aliases[i]))
+
+    # Fuzzy Matching (Handles typos & near-matches)
+    with phase("fuzzy"):
+        fuzzy_matches = index.fuzzy_choices.extract(input_name, limit=5, threshold=PARTIAL_RATIO_THRESHOLD)
+    for alias, _ in fuzzy_matches:
+        matched_courses.extend(index.standard_names(alias))
+
+    return list(set(matched_courses))  # Remove duplicates
+
+
+def ngram_matches(ngram_index, input_name, k=NGRAM_TOP_K):
+    """Standard names of the k aliases nearest in character n-gram space, best first."""
+    with phase("tfidf"):
+        nearest = ngram_index.top_k(input_name, k)
+    alias_index = ngram_index.alias_index
+    matched_courses = {}
+    for position, _ in nearest:
+        for name in alias_index.standard_names(alias_index.aliases[position]):
+            matched_courses.setdefault(name, None)
+    return list(matched_courses)
+
+
+def match_course_name(input_name):
+    """Match course names with the configured MATCH_ENGINE."""
+    try:
+        with phase("index_lookup"):
+            index = get_alias_index()
+            ngram_index = get_ngram_index() if MATCH_ENGINE == "ngram" and index.aliases else None
+        if not index.aliases:
+            return []
+        if ngram_index is not None:
+            return ngram_matches(ngram_index, input_name)
+        return combined_matches(index, input_name)
+
+    except Exception as e:
+        log.error(f"Error in matching course names: {e}")
+        return []
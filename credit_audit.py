@@ -0,0 +1,151 @@
+"""Earned-versus-required credits of every student in a department, in one pass.
+
+The department's student index already holds each student's completed
+curriculum rows, so earned credits per (student, category) come from a
+single bincount over all of them (see StudentCreditIndex.earned_credit_matrix)
+rather than one /credit_details computation per register number.
+"""
+import csv
+import io
+import logging
+import math
+import click
+import numpy as np
+from flask import Blueprint, Response, jsonify, request
+from admin_auth import admin_required
+from credit_details import get_student_index, get_total_credit_info
+from credit_index import ALL_CATEGORIES
+from registry import DEPARTMENTS, cohort
+
+credit_audit_bp = Blueprint('credit_audit', __name__)
+log = logging.getLogger(__name__)
+
+# Categories reported, TOTAL last
+AUDIT_CATEGORIES = [category for category in ALL_CATEGORIES if category != "TOTAL"] + ["TOTAL"]
+
+
+def report_columns():
+    columns = ["reg_no", "join_year"]
+    for category in AUDIT_CATEGORIES:
+        columns += [f"{category}_earned", f"{category}_required", f"{category}_shortfall"]
+    return columns + ["complete"]
+
+
+def _number(value):
+    return None if math.isnan(value) else float(value)
+
+
+def _requirement(requirements, category):
+    try:
+        return float(requirements[category])
+    except (KeyError, TypeError, ValueError):
+        return math.nan
+
+
+def audit_department(department_code, shortfall_only=False):
+    """Return one report row per student of the department, or None if it has no student index.
+
+    A requirement that can't be found is None, and so is its shortfall; such
+    a student is never reported as complete. Raises ValueError when the
+    department's sheets are missing from the workbooks.
+    """
+    index = get_student_index(department_code)
+    if index is None:
+        return None
+
+    reg_nos = index.register_numbers()
+    categories, earned_by_category = index.earned_credit_matrix()
+
+    # Earned credits in AUDIT_CATEGORIES order; TOTAL counts every category, as the summary does
+    earned = np.zeros((len(reg_nos), len(AUDIT_CATEGORIES)))
+    for column, category in enumerate(AUDIT_CATEGORIES[:-1]):
+        if category in categories:
+            earned[:, column] = earned_by_category[:, categories.index(category)]
+    earned[:, -1] = earned_by_category.sum(axis=1)
+
+    # Requirements depend on the join year, looked up once per year
+    join_years = [int(reg_no[4:6]) if len(reg_no) == 12 and reg_no.isdigit() else None for reg_no in reg_nos]
+    requirement_rows = {}
+    for join_year in set(join_years):
+        requirements = get_total_credit_info(cohort(department_code, join_year)) if join_year is not None else None
+        requirement_rows[join_year] = [_requirement(requirements or {}, category) for category in AUDIT_CATEGORIES]
+    required = np.array([requirement_rows[join_year] for join_year in join_years]).reshape(earned.shape)
+
+    shortfall = np.maximum(required - earned, 0)
+    complete = (shortfall == 0).all(axis=1)
+
+    rows = []
+    for position, reg_no in enumerate(reg_nos):
+        if shortfall_only and complete[position]:
+            continue
+        row = {"reg_no": reg_no, "join_year": join_years[position]}
+        for column, category in enumerate(AUDIT_CATEGORIES):
+            row[f"{category}_earned"] = float(earned[position, column])
+            row[f"{category}_required"] = _number(required[position, column])
+            row[f"{category}_shortfall"] = _number(shortfall[position, column])
+        row["complete"] = bool(complete[position])
+        rows.append(row)
+    return rows
+
+
+def write_report(rows, path):
+    """Write audit rows to a .csv or .parquet file (Parquet needs pyarrow)."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=report_columns())
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+@credit_audit_bp.route('/credit_audit/<department_code>')
+@admin_required
+def credit_audit(department_code):
+    """The department's audit as CSV, or as JSON with ?format=json; ?shortfall_only=1 leaves out complete students.
+
+    Every student's records are exported, so the admin token is required.
+    """
+    shortfall_only = request.args.get("shortfall_only", "0") == "1"
+    try:
+        rows = audit_department(department_code, shortfall_only)
+    except (KeyError, ValueError) as e:
+        log.error(f"Unable to audit department {department_code}: {e}")
+        rows = None
+    if rows is None:
+        return jsonify({"error": f"No student data for department {department_code}"}), 404
+
+    if request.args.get("format") == "json":
+        return jsonify({"department_code": department_code, "students": rows})
+
+    report = io.StringIO()
+    writer = csv.DictWriter(report, fieldnames=report_columns())
+    writer.writeheader()
+    writer.writerows(rows)
+    return Response(report.getvalue(), mimetype="text/csv", headers={
+        "Content-Disposition": f"attachment; filename=credit_audit_{department_code}.csv"})
+
+
+@click.command("credit-audit")
+@click.argument("department_codes", nargs=-1)
+@click.option("--output", "-o", default="credit_audit.csv", show_default=True,
+              help="report file; a .parquet name writes Parquet")
+@click.option("--shortfall-only", is_flag=True, help="leave out students meeting every requirement")
+def credit_audit_command(department_codes, output, shortfall_only):
+    """Write earned-versus-required credits of every student in the given departments (default: all)."""
+    rows = []
+    for department_code in department_codes or DEPARTMENTS:
+        try:
+            department_rows = audit_department(department_code, shortfall_only)
+        except (KeyError, ValueError) as e:
+            log.error(f"Unable to audit department {department_code}: {e}")
+            department_rows = None
+        if department_rows is None:
+            click.echo(f"No student data for department {department_code}", err=True)
+            continue
+        rows.extend(department_rows)
+    try:
+        write_report(rows, output)
+    except ImportError as e:
+        raise click.ClickException(f"Unable to write {output}: {e}")
+    click.echo(f"{len(rows)} students written to {output}")
@@ -1,101 +1,54 @@
 from flask import Blueprint, request, render_template, jsonify
-import pandas as pd
+import logging
 import os
+import data_reload
+import data_store
+from http_cache import cached_response
+from instrumentation import phase
+from credit_index import load_curriculum_index, load_student_index, split_course_cells
+from registry import CREDIT_SHEETS, DEFAULT_CREDIT_SHEET, DEPARTMENTS, cohort_for
+from result_cache import TTLCache, VersionedCache
 
 credit_details_bp = Blueprint('credit_details', __name__)
+log = logging.getLogger(__name__)
 
 # File Paths
 CREDITS_FILE = os.path.join(os.getcwd(), "data", "credits.xlsx")
 STUDENT_DETAILS_FILE = os.path.join(os.getcwd(), "data", "student_credits.xlsx")
 CURRICULUM_FILE = os.path.join(os.getcwd(), "data", "curriculum.xlsx")
 
-DEPARTMENT_MAPPINGS_stu = {
-    "23": "Artificial Intelligence and Data Science (AI&DS)",
-    "24": "Artificial Intelligence and Machine Learning (AIML)",
-    "10": "CSE (Cyber Security)",
-    "11": "CSE (Internet of Things)",
-    "01": "Computer Science and Engineering",
-    "22": "Information Technology"
-}
-
-# Department mappings for sheets
-DEPARTMENT_MAPPINGS = {
-    "23": "aids_courses",
-    "24": "aiml",
-    "10": "CSE (Cyber Security)",
-    "11": "CSE (Internet of Things)",
-    "01": "Computer Science and Engineering",
-    "22": "Information Technology"
-}
-
-# Curriculum Sheet Mapping
-CURRICULUM_SHEET_MAPPING = {
-    "23": "R2019-AI&DS",
-    "24": "AIML",
-    "10": "CSE(CS)",
-    "11": "CSE(IOT)",
-    "01": "CSE",
-    "22": "IT"
-}
-
-# Sheet Mapping for Credit Requirements
-CREDIT_SHEET_MAPPING = {
-    21: "credit_details 19-1",
-    22: "credit details 19-2",
-    23: "credit details 19-2",
-    24: "credit details 24"
-}
-
-# Mapping Department Code to Column Name in `credits.xlsx`
-CREDIT_DEPARTMENT_MAPPING = {
-    "23": "AIDS",
-    "24": "AIML",
-    "10": "CSC",
-    "11": "IOT",
-    "01": "CS",
-    "22": "IT"
-}
+data_reload.watch(CURRICULUM_FILE, [department["curriculum_sheet"] for department in DEPARTMENTS.values()],
+                  ["Course Title", "CATEGORY", "Total Credits"], header=1)
+data_reload.watch(STUDENT_DETAILS_FILE, [department["student_sheet"] for department in DEPARTMENTS.values()],
+                  ["Register Number"], preload=False)
+data_reload.watch(CREDITS_FILE, set(CREDIT_SHEETS.values()) | {DEFAULT_CREDIT_SHEET}, ["CATEGORY"])
 
 def get_student_details(reg_no):
     """Extracts student department, year, and regulation from register number."""
-    if len(reg_no) != 12 or not reg_no.isdigit():
+    cohort = cohort_for(reg_no)
+    if cohort is None:
         return None
 
-    join_year = int(reg_no[4:6])
-    department_code = reg_no[6:8]
-    regulation = "R2019" if join_year <= 23 else "R2024"
-    department = DEPARTMENT_MAPPINGS_stu.get(department_code, "Unknown Department")
-
-    current_year = (2025 % 100) - join_year + 1
-    student_year = f"{current_year}{['th', 'st', 'nd', 'rd'][min(current_year, 3)]} Year" if 1 <= current_year <= 4 else "Graduated"
-
     return {
         "reg_no": reg_no,
-        "department": department,
-        "student_year": student_year,
-        "regulation": regulation,
-        "department_code": department_code
+        "department": cohort.department,
+        "student_year": cohort.student_year,
+        "regulation": cohort.regulation,
+        "department_code": cohort.department_code
     }
 
-def get_total_credit_info(department_code, join_year):
-    """Fetches total credit requirements for the student's department."""
-    if not os.path.exists(CREDITS_FILE):
-        print("[ERROR] Credits file not found")
-        return None
-
-    sheet_name = CREDIT_SHEET_MAPPING.get(join_year, "credit details 24")
-
+def load_credit_requirements(sheet_name, credit_column):
     try:
-        df = pd.read_excel(CREDITS_FILE, sheet_name=sheet_name)
+        df = data_store.read_excel(CREDITS_FILE, sheet_name=sheet_name)
         df.columns = df.columns.str.strip().str.upper()
 
         if "CATEGORY" not in df.columns:
-            print(f"[ERROR] 'CATEGORY' column not found in sheet '{sheet_name}'")
+            log.error(f"'CATEGORY' column not found in sheet '{sheet_name}'")
             return None
 
-        department_key = CREDIT_DEPARTMENT_MAPPING.get(department_code, "").upper()
+        department_key = credit_column.upper()
         if department_key not in df.columns:
-            print(f"[ERROR] Department '{department_key}' not found in sheet '{sheet_name}'")
+            log.error(f"Department '{department_key}' not found in sheet '{sheet_name}'")
             return None
 
         credit_info = df[["CATEGORY", department_key]].to_dict(orient="records")
@@ -103,115 +56,180 @@ def get_total_credit_info(department_code, join_year):
 
         return total_credits_dict
     except Exception as e:
-        print(f"[ERROR] Unable to fetch total credits from '{sheet_name}': {e}")
+        log.error(f"Unable to fetch total credits from '{sheet_name}': {e}")
         return None
 
-def get_student_credit_info(reg_no, department_code):
-    """Fetches student's completed courses and computes earned credits per category."""
-    if not os.path.exists(STUDENT_DETAILS_FILE):
-        print("[ERROR] Student details file not found")
-        return None
+_credit_requirements = VersionedCache()
 
-    try:
-        sheet_name = DEPARTMENT_MAPPINGS.get(department_code, "Unknown Department")
-        df = pd.read_excel(STUDENT_DETAILS_FILE, sheet_name=sheet_name)
-        df.columns = df.columns.str.strip().str.upper()
+def get_total_credit_info(cohort):
+    """Fetches total credit requirements for the cohort's department, read once per credits.xlsx version."""
+    if not os.path.exists(CREDITS_FILE):
+        log.error("Credits file not found")
+        return None
 
-        reg_col = next((col for col in df.columns if "REGISTER NUMBER" in col), None)
-        if not reg_col:
-            print("[ERROR] 'Register Number' column not found")
-            return None
+    return _credit_requirements.get((cohort.credit_sheet, cohort.credit_column), data_reload.file_signature(CREDITS_FILE),
+                                    load_credit_requirements, cohort.credit_sheet, cohort.credit_column)
 
-        df[reg_col] = df[reg_col].astype(str).str.strip()
-        student_data = df[df[reg_col] == reg_no]
+_curriculum_indexes = VersionedCache()
+_student_indexes = VersionedCache()
 
-        if student_data.empty:
-            print(f"[ERROR] No data found for Register Number: {reg_no}")
-            return None
+def get_curriculum_index(department_code):
+    """Return the indexed curriculum sheet of a department, rebuilt when curriculum.xlsx changes."""
+    sheet_name = DEPARTMENTS.get(department_code, {}).get("curriculum_sheet")
+    if not sheet_name:
+        return None
 
-        completed_courses = student_data.iloc[0].drop([reg_col, "NAME"], errors="ignore").dropna().tolist()
-        earned_credits = compute_earned_credits(completed_courses, department_code)
+    return _curriculum_indexes.get(sheet_name, data_reload.file_signature(CURRICULUM_FILE),
+                                   load_curriculum_index, CURRICULUM_FILE, sheet_name)
 
-        return earned_credits
-    except Exception as e:
-        print(f"[ERROR] Unable to fetch student credit details: {e}")
+def get_student_index(department_code):
+    """Return the register-number index of a department's students, rebuilt when the data changes."""
+    curriculum = get_curriculum_index(department_code)
+    if curriculum is None:
+        log.error(f"No sheet mapping found for department code: {department_code}")
         return None
 
-def compute_earned_credits(completed_courses, department_code):
-    """Computes earned credits per category and lists completed courses."""
-    if not os.path.exists(CURRICULUM_FILE):
-        print(f"[ERROR] Curriculum file not found at: {CURRICULUM_FILE}")
-        return None
+    sheet_name = DEPARTMENTS[department_code]["student_sheet"]
+    version = (data_reload.file_signature(STUDENT_DETAILS_FILE), curriculum.fingerprint)
+    return _student_indexes.get(department_code, version, load_student_index,
+                                STUDENT_DETAILS_FILE, sheet_name, curriculum, CURRICULUM_FILE)
 
-    sheet_name = CURRICULUM_SHEET_MAPPING.get(department_code)
-    if not sheet_name:
-        print(f"[ERROR] No sheet mapping found for department code: {department_code}")
+def get_student_credit_info(reg_no, department_code):
+    """Fetches student's completed courses and computes earned credits per category."""
+    if not os.path.exists(STUDENT_DETAILS_FILE):
+        log.error("Student details file not found")
+        return None
+    if not os.path.exists(CURRICULUM_FILE):
+        log.error(f"Curriculum file not found at: {CURRICULUM_FILE}")
         return None
 
     try:
-        df = pd.read_excel(CURRICULUM_FILE, sheet_name=sheet_name, header=1)
-        df.columns = df.columns.str.strip().str.upper()
-
-        # Normalize course titles for comparison
-        df["COURSE TITLE"] = df["COURSE TITLE"].str.strip().str.lower()
-        cleaned_courses = [c.strip().lower() for cell in completed_courses if isinstance(cell, str) for c in cell.split(",")]
-
-        # Filter courses that match completed ones
-        df_filtered = df[df["COURSE TITLE"].isin(cleaned_courses)]
-        df_filtered.loc[:, "TOTAL CREDITS"] = pd.to_numeric(df_filtered["TOTAL CREDITS"], errors='coerce').fillna(0)
-
-        earned_credit_summary = df_filtered.groupby("CATEGORY")["TOTAL CREDITS"].sum().to_dict()
-        completed_courses_by_category = df_filtered.groupby("CATEGORY")["COURSE TITLE"].apply(list).to_dict()
-
-        # ✅ Keep category names as they are (BS, PC, etc.)
-        normalized_credits = earned_credit_summary.copy()
-        normalized_courses = completed_courses_by_category.copy()
+        student_index = get_student_index(department_code)
+    except Exception as e:
+        log.error(f"Unable to fetch student credit details: {e}")
+        return None
 
-        # Ensure all categories exist in the dictionary (even if they are 0)
-        all_categories = ["BS", "EEC", "ES", "HS", "MC", "OE", "PC", "PE", "TOTAL"]
-        for cat in all_categories:
-            normalized_credits.setdefault(cat, 0)
-            normalized_courses.setdefault(cat, [])
+    if student_index is None:
+        return None
 
-        # Calculate total credits
-        normalized_credits["TOTAL"] = sum(v for k, v in normalized_credits.items() if k != "TOTAL")
+    credit_info = student_index.credit_info(reg_no)
+    if credit_info is None:
+        log.error(f"No data found for Register Number: {reg_no}")
+    return credit_info
 
-        return {
-            "earned_credits": normalized_credits,
-            "completed_courses": normalized_courses
-        }
+def compute_earned_credits(completed_courses, department_code):
+    """Computes earned credits per category and lists completed courses."""
+    if not os.path.exists(CURRICULUM_FILE):
+        log.error(f"Curriculum file not found at: {CURRICULUM_FILE}")
+        return None
 
+    try:
+        curriculum = get_curriculum_index(department_code)
     except Exception as e:
-        print(f"[ERROR] Unable to read curriculum.xlsx: {e}")
+        log.error(f"Unable to read curriculum.xlsx: {e}")
+        return None
+
+    if curriculum is None:
+        log.error(f"No sheet mapping found for department code: {department_code}")
         return None
+
+    return curriculum.summarize(curriculum.matching_rows(split_course_cells(completed_courses)))
     
+def warm_up():
+    """Build every mapped department's curriculum and student indexes and load the credit requirement sheets."""
+    for department_code in DEPARTMENTS:
+        try:
+            get_student_index(department_code)
+        except Exception as e:
+            log.warning(f"Skipping credit indexes for department {department_code}: {e}")
+    for sheet_name in set(CREDIT_SHEETS.values()):
+        try:
+            data_store.read_excel(CREDITS_FILE, sheet_name=sheet_name)
+        except Exception as e:
+            log.warning(f"Skipping credit requirements sheet '{sheet_name}': {e}")
+
+# Per-student results keyed on (reg_no, data version), shared by both endpoints
+credit_summary_cache = TTLCache(
+    max_entries=int(os.environ.get("CREDIT_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("CREDIT_CACHE_TTL", "300")),
+)
+
+def build_credit_summary(reg_no):
+    """Compute everything /credit_details and /get_completed_courses return for one student."""
+    summary = {
+        "student_info": get_student_details(reg_no),
+        "student_credit_info": None,
+        "total_credit_info": None,
+        "course_details": {},
+        "course_details_error": None,
+    }
+    student_info = summary["student_info"]
+    if not student_info:
+        return summary
+
+    cohort = cohort_for(reg_no)
+    department_code = cohort.department_code
+    summary["student_credit_info"] = get_student_credit_info(reg_no, department_code)
+    summary["total_credit_info"] = get_total_credit_info(cohort)
+    if summary["student_credit_info"] is None:
+        return summary
+
+    curriculum = get_curriculum_index(department_code)
+    if not curriculum:
+        summary["course_details_error"] = ("Curriculum sheet not found for department", 404)
+        return summary
+
+    # Course Code column of the student's regulation
+    course_code_column = cohort.course_code_column
+
+    # Ensure required columns exist
+    missing_columns = curriculum.missing_columns(course_code_column)
+    if missing_columns:
+        summary["course_details_error"] = (f"Missing required columns in curriculum data: {missing_columns}", 500)
+        return summary
+
+    # Matching course details per category, with the course code column renamed to "Course Code"
+    for category, completed_courses in summary["student_credit_info"]["completed_courses"].items():
+        summary["course_details"][category] = curriculum.course_details(completed_courses, course_code_column)
+    return summary
+
+def get_credit_summary(reg_no):
+    """Return the student's credit summary, computed at most once per data version."""
+    with phase("index_lookup"):
+        key = (reg_no, data_store.data_version())
+        summary = credit_summary_cache.get(key)
+        if summary is None:
+            summary = build_credit_summary(reg_no)
+            credit_summary_cache.set(key, summary)
+    return summary
+
 @credit_details_bp.route('/credit_details', methods=['GET', 'POST'])
+@cached_response
 def credit_details():
     if request.method == "POST":
         reg_no = request.json.get("reg_no", "").strip()
-        student_info = get_student_details(reg_no)
+        summary = get_credit_summary(reg_no)
 
-        if not student_info:
+        if not summary["student_info"]:
             return jsonify({"error": "Invalid Register Number"}), 400
 
-        student_credit_info = get_student_credit_info(reg_no, student_info["department_code"])
-        total_credit_info = get_total_credit_info(student_info["department_code"], int(reg_no[4:6]))
-        completed_courses = student_credit_info["completed_courses"] if student_credit_info else {}
-        
+        student_credit_info = summary["student_credit_info"]
+
         # If student data is not found, return an error response
         if student_credit_info is None:
             return jsonify({"error": "No data found for the entered register number. please check your register number"}), 404
 
         return jsonify({
-            "student_info": student_info,
-            "total_credit_info": total_credit_info,
+            "student_info": summary["student_info"],
+            "total_credit_info": summary["total_credit_info"],
             "student_credit_info": student_credit_info["earned_credits"],
-            "completed_courses": completed_courses
+            "completed_courses": student_credit_info["completed_courses"]
         })
     
     return render_template('credit_details.html')
 
 @credit_details_bp.route('/get_completed_courses', methods=['POST'])
+@cached_response
 def get_completed_courses():
     try:
         data = request.json
@@ -221,64 +239,23 @@ def get_completed_courses():
         if not reg_no or not category:
             return jsonify({"error": "Missing register number or category"}), 400
 
-        # Fetch student info
-        student_info = get_student_details(reg_no)
-        if not student_info:
+        # Served from the summary /credit_details already computed for this student
+        summary = get_credit_summary(reg_no)
+        if not summary["student_info"]:
             return jsonify({"error": "Invalid register number"}), 400
 
-        department_code = student_info["department_code"]
-        regulation = student_info["regulation"]  # Fetch student's regulation (R2019 or R2024)
-        student_credit_info = get_student_credit_info(reg_no, department_code)
-
-        if not student_credit_info:
+        if not summary["student_credit_info"]:
             return jsonify({"error": "Student credit information not found"}), 404
 
-        # Get completed courses for the given category
-        completed_courses = student_credit_info.get("completed_courses", {}).get(category, [])
-
-        # Validate department sheet
-        curriculum_sheet = CURRICULUM_SHEET_MAPPING.get(department_code)
-        
-        if not curriculum_sheet:
-            return jsonify({"error": "Curriculum sheet not found for department"}), 404
-
-        # Read curriculum data
-        curriculum_df = pd.read_excel(CURRICULUM_FILE, sheet_name=curriculum_sheet, header=1)
-        curriculum_df.columns = curriculum_df.columns.str.strip()
-        curriculum_df = curriculum_df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-        # Determine correct Course Code column based on regulation
-        course_code_column = "Course Code R2019" if regulation == "R2019" else "Course Code R2024"
-
-        # Ensure required columns exist
-        required_columns = {course_code_column, "Course Title", "Theory Credits", "Practical Credits", "Total Credits"}
-        missing_columns = required_columns - set(curriculum_df.columns)
-        if missing_columns:
-            return jsonify({"error": f"Missing required columns in curriculum data: {missing_columns}"}), 500
-
-        # Normalize course titles for matching
-        curriculum_df["Course Title"] = curriculum_df["Course Title"].str.lower().str.strip()
-        completed_courses = [course.lower().strip() for course in completed_courses]
-
-        # Extract matching course details
-        completed_course_details = curriculum_df[curriculum_df["Course Title"].isin(completed_courses)][
-            [course_code_column, "Course Title",  "Theory Credits", "Practical Credits", "Total Credits"]
-        ]
-
-        # Rename course code column dynamically
-        completed_course_details = completed_course_details.rename(columns={course_code_column: "Course Code"})
-
-        # Replace NaN values with "N/A"
-        completed_course_details = completed_course_details.fillna("N/A")  
-
-        # Convert to JSON-friendly format
-        completed_course_list = completed_course_details.to_dict(orient="records")
+        if summary["course_details_error"]:
+            message, status = summary["course_details_error"]
+            return jsonify({"error": message}), status
 
         return jsonify({
             "category": category,
-            "courses": completed_course_list
+            "courses": summary["course_details"].get(category, [])
         })
 
     except Exception as e:
-        print(f"[ERROR] {str(e)}")
+        log.error(str(e))
         return jsonify({"error": "Internal server error"}), 500
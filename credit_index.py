@@ -0,0 +1,237 @@
+import hashlib
+import os
+from array import array
+import data_plane
+import data_reload
+import data_store
+
+# Categories always present in a credit summary, even when nothing was earned
+ALL_CATEGORIES = ["BS", "EEC", "ES", "HS", "MC", "OE", "PC", "PE", "TOTAL"]
+
+# Columns of the per-course detail table shown when a category is expanded
+DETAIL_COLUMNS = ["Course Title", "Theory Credits", "Practical Credits", "Total Credits"]
+
+# (workbook, version, sheet) of student sheets found missing, so a bad
+# mapping doesn't reopen the workbook on every request
+_missing_sheets = set()
+
+
+def split_course_cells(cells):
+    """Normalize a student's comma-separated course cells into lower-cased titles."""
+    return [c.strip().lower() for cell in cells if isinstance(cell, str) for c in cell.split(",")]
+
+
+class CurriculumIndex:
+    """One curriculum sheet, indexed by normalized course title."""
+
+    def __init__(self, df):
+        import pandas as pd
+
+        raw_columns = df.columns.str.strip()
+        df = df.copy()
+        df.columns = raw_columns.str.upper()
+
+        self.titles = df["COURSE TITLE"].str.strip().str.lower().tolist()
+        # Rows without a category (None) never count towards a summary
+        self.categories = [None if pd.isna(category) else category for category in df["CATEGORY"]]
+        self.credits = pd.to_numeric(df["TOTAL CREDITS"], errors='coerce').fillna(0).tolist()
+
+        # Student arrays store row positions, so they are only valid for the same title order
+        self.fingerprint = hashlib.sha1("\n".join(map(str, self.titles)).encode("utf-8")).hexdigest()
+
+        self.title_rows = {}
+        for position, title in enumerate(self.titles):
+            if isinstance(title, str):
+                self.title_rows.setdefault(title, []).append(position)
+
+        # Detail rows for the category drill-down, with the sheet's own column names
+        details = df.copy()
+        details.columns = raw_columns
+        details = details.map(lambda x: x.strip() if isinstance(x, str) else x)
+        self.detail_columns = set(details.columns)
+        details = details.loc[:, ~details.columns.duplicated()]
+        if "Course Title" in details.columns:
+            details["Course Title"] = details["Course Title"].str.lower().str.strip()
+        self.details = details.fillna("N/A").to_dict(orient="records")
+
+    def matching_rows(self, titles):
+        """Curriculum row positions, in sheet order, whose title is one of `titles`."""
+        return sorted({position for title in set(titles) for position in self.title_rows.get(title, ())})
+
+    def summarize(self, rows):
+        """Earned credits and completed course titles per category for the given rows."""
+        earned_credits = {}
+        completed_courses = {}
+        for position in rows:
+            category = self.categories[position]
+            if category is None:
+                continue
+            earned_credits[category] = earned_credits.get(category, 0) + self.credits[position]
+            completed_courses.setdefault(category, []).append(self.titles[position])
+
+        # Ensure all categories exist in the dictionary (even if they are 0)
+        for cat in ALL_CATEGORIES:
+            earned_credits.setdefault(cat, 0)
+            completed_courses.setdefault(cat, [])
+
+        # Calculate total credits
+        earned_credits["TOTAL"] = sum(v for k, v in earned_credits.items() if k != "TOTAL")
+
+        return {
+            "earned_credits": earned_credits,
+            "completed_courses": completed_courses
+        }
+
+    def course_details(self, titles, course_code_column):
+        """Detail rows for courses with the given titles, or None if a required column is missing."""
+        if course_code_column not in self.detail_columns or not set(DETAIL_COLUMNS) <= self.detail_columns:
+            return None
+        columns = [course_code_column] + DETAIL_COLUMNS
+        return [
+            {("Course Code" if column == course_code_column else column): self.details[position][column]
+             for column in columns}
+            for position in self.matching_rows(titles)
+        ]
+
+    def missing_columns(self, course_code_column):
+        return {course_code_column, *DETAIL_COLUMNS} - self.detail_columns
+
+
+def read_student_rows(path, sheet_name):
+    """Stream (register number, course cells) for each row of a student sheet, one row at a time.
+
+    Uses openpyxl's read-only mode, so only the current row is in memory.
+    Columns are taken as pandas would read them: the first row names them,
+    the register number column is the first whose name contains "REGISTER
+    NUMBER", and every other column except NAME holds course cells.
+    Rows without a register number are skipped.
+    """
+    from openpyxl import load_workbook
+
+    key = (os.path.abspath(path), data_reload.file_signature(path), sheet_name)
+    if key in _missing_sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            _missing_sheets.add(key)
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = ["" if name is None else str(name).strip().upper() for name in next(rows, ())]
+        reg_col = next((position for position, name in enumerate(header) if "REGISTER NUMBER" in name), None)
+        if reg_col is None:
+            raise KeyError("'Register Number' column not found")
+        course_columns = [position for position, name in enumerate(header) if position != reg_col and name != "NAME"]
+
+        for row in rows:
+            reg_no = row[reg_col] if reg_col < len(row) else None
+            if reg_no is None:
+                continue
+            # Register numbers typed as numbers can come back as floats
+            if isinstance(reg_no, float) and reg_no.is_integer():
+                reg_no = int(reg_no)
+            yield str(reg_no).strip(), [row[position] for position in course_columns if position < len(row)]
+    finally:
+        workbook.close()
+
+
+def build_student_arrays(students, curriculum):
+    """Each student's completed curriculum rows in CSR layout, sorted by register number.
+
+    `students` yields (register number, course cells) pairs, as
+    read_student_rows does; the first row of a register number wins. Each
+    row is turned into curriculum row positions as it arrives, so what
+    grows with the sheet is an int32 array rather than the cell strings.
+    """
+    import numpy as np
+
+    positions = {}
+    starts = array("q", [0])
+    rows = array("i")
+    for reg_no, cells in students:
+        if reg_no not in positions:
+            positions[reg_no] = len(positions)
+            rows.extend(curriculum.matching_rows(split_course_cells(cells)))
+            starts.append(len(rows))
+
+    ordered = sorted(positions)
+    order = np.array([positions[reg_no] for reg_no in ordered], dtype=np.int64)
+    starts = np.frombuffer(starts, dtype=np.int64)
+    rows = np.frombuffer(rows, dtype=np.intc).astype(np.int32)
+    row_counts = np.diff(starts)[order]
+    indptr = np.zeros(len(ordered) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(row_counts)
+    # Position i of the sorted rows comes from the student's own run in arrival order
+    gather = np.repeat(starts[:-1][order] - indptr[:-1], row_counts) + np.arange(indptr[-1])
+    return {
+        "reg_nos": np.array([reg_no.encode("utf-8") for reg_no in ordered], dtype=bytes),
+        "indptr": indptr,
+        "rows": rows[gather],
+    }
+
+
+class StudentCreditIndex:
+    """Every student of one department sheet, keyed by register number.
+
+    Only each student's completed curriculum rows are kept, as flat arrays
+    (see build_student_arrays) that can live in a shared data plane; the
+    per-category summary is computed from them on lookup, without pandas.
+    """
+
+    def __init__(self, arrays, curriculum):
+        self.curriculum = curriculum
+        self.reg_nos = arrays["reg_nos"]
+        self.indptr = arrays["indptr"]
+        self.rows = arrays["rows"]
+
+    def __len__(self):
+        return len(self.reg_nos)
+
+    def credit_info(self, reg_no):
+        """Return the student's earned credits and completed courses, or None if unknown."""
+        key = reg_no.encode("utf-8")
+        position = int(self.reg_nos.searchsorted(key))
+        if position >= len(self.reg_nos) or self.reg_nos[position] != key:
+            return None
+        rows = self.rows[self.indptr[position]:self.indptr[position + 1]].tolist()
+        return self.curriculum.summarize(rows)
+
+    def register_numbers(self):
+        return [reg_no.decode("utf-8") for reg_no in self.reg_nos.tolist()]
+
+    def earned_credit_matrix(self):
+        """Return (categories, students x categories array of earned credits) for every student at once.
+
+        Students are in register-number order; the sums match credit_info's.
+        """
+        import numpy as np
+
+        curriculum = self.curriculum
+        categories = sorted({category for category in curriculum.categories if category is not None}, key=str)
+        column_of = {category: column for column, category in enumerate(categories)}
+        row_columns = np.array([column_of.get(category, -1) for category in curriculum.categories], dtype=np.int64)
+        row_credits = np.asarray(curriculum.credits, dtype=float)
+
+        students = np.repeat(np.arange(len(self.reg_nos)), np.diff(self.indptr))
+        columns = row_columns[self.rows]
+        counted = columns >= 0
+        earned = np.bincount(students[counted] * len(categories) + columns[counted],
+                             weights=row_credits[self.rows[counted]],
+                             minlength=len(self.reg_nos) * len(categories))
+        return categories, earned.reshape(len(self.reg_nos), len(categories))
+
+
+def load_curriculum_index(path, sheet_name):
+    return CurriculumIndex(data_store.read_excel(path, sheet_name=sheet_name, header=1))
+
+
+def load_student_index(path, sheet_name, curriculum, curriculum_path):
+    """Map the department's student arrays from the data plane, building them if the workbooks changed."""
+    arrays = data_plane.load_or_build(
+        f"students-{sheet_name}",
+        [path, curriculum_path],
+        lambda: build_student_arrays(read_student_rows(path, sheet_name), curriculum),
+        key={"sheet": sheet_name, "curriculum": curriculum.fingerprint},
+    )
+    return StudentCreditIndex(arrays, curriculum)
@@ -0,0 +1,132 @@
+"""Compiled index arrays in memory-mapped files shared by every worker.
+
+Each plane is one file: a JSON header describing the arrays and the source
+files they were built from, followed by the raw, 64-byte aligned array
+data. Workers map it read-only and wrap zero-copy numpy views around it, so
+the operating system keeps a single copy in the page cache however many
+workers there are.
+
+A rebuilt plane is written to a temporary file and renamed over the old
+one. Indexes already holding the old mapping keep working on it until they
+are dropped, and the next load maps the new file.
+"""
+import json
+import logging
+import os
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+DATA_PLANE_DIR = os.environ.get("DATA_PLANE_DIR", os.path.join(os.getcwd(), "data", "plane"))
+DATA_PLANE_ENABLED = os.environ.get("DATA_PLANE", "1") == "1"
+
+_MAGIC = b"WPPLANE1"
+_ALIGNMENT = 64
+_FORMAT_VERSION = 1
+
+
+def source_signatures(paths):
+    """(mtime_ns, size) of each source file, keyed by file name."""
+    signatures = {}
+    for path in paths:
+        stat = os.stat(path)
+        signatures[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
+    return signatures
+
+
+def encode_strings(strings):
+    """Pack strings into a UTF-8 byte array plus an offsets array."""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(item) for item in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(blob, offsets):
+    """Inverse of encode_strings."""
+    data = blob.tobytes()
+    return [data[start:end].decode("utf-8") for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_plane(path, arrays, sources, key=None):
+    """Write arrays to a plane file, replacing any existing one atomically."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = json.dumps({
+        "version": _FORMAT_VERSION,
+        "sources": sources,
+        "key": key,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = _align(len(_MAGIC) + 8 + len(header))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + _align(offset))
+    os.replace(temp_path, path)
+
+
+def map_plane(path):
+    """Map a plane file read-only; return (arrays, header)."""
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Not a data plane file: {path}")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length))
+    data_start = _align(len(_MAGIC) + 8 + header_length)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    return arrays, header
+
+
+def load_or_build(name, source_paths, build, key=None):
+    """Return the arrays of plane `name`, building and publishing them when missing or stale.
+
+    `build()` returns a dict of numpy arrays. The plane counts as current
+    when it was built from the same source files (mtime and size) and with
+    the same `key`. When planes are disabled or the directory can't be
+    written, the freshly built in-memory arrays are returned instead.
+    """
+    if not DATA_PLANE_ENABLED:
+        return build()
+
+    path = os.path.join(DATA_PLANE_DIR, f"{name}.plane")
+    sources = source_signatures(source_paths)
+    try:
+        arrays, header = map_plane(path)
+        if header["version"] == _FORMAT_VERSION and header["sources"] == sources and header["key"] == key:
+            return arrays
+    except (OSError, ValueError, KeyError):
+        pass
+
+    arrays = build()
+    try:
+        write_plane(path, arrays, sources, key)
+        mapped, _ = map_plane(path)
+        return mapped
+    except OSError as e:
+        log.warning("Unable to publish data plane %s, keeping it in process memory: %s", name, e)
+        return arrays
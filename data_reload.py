@@ -0,0 +1,228 @@
+"""Pick up replaced workbooks without restarting workers.
+
+Each worker runs a watcher thread that polls the watched files' mtime and
+size. Once a change has settled, the new workbooks are validated (every
+watched sheet must still have its required columns) and all indexes are
+rebuilt in the background for the new file versions. The new generation
+is then published with a single assignment. Until that point requests keep
+being served from the previous generation's indexes, so in-flight requests
+never wait on a reload.
+
+Index caches key their entries on `file_signature(path)`: the version of
+the file in the generation being served, or in the one being built when
+called from the rebuild.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+# Seconds between checks of the watched files (0 disables the watcher)
+DATA_RELOAD_INTERVAL = float(os.environ.get("DATA_RELOAD_INTERVAL", "5"))
+
+# path -> [(sheets, header row, required columns, columns read, preloaded)]
+_sources = {}
+
+# {path: (mtime_ns, size)} of the served generation, while the watcher runs
+_served = None
+# ... and of the last generation built, whether or not the watcher runs
+_published = None
+_building = contextvars.ContextVar("building_signatures", default=None)
+
+# Generation 1 is the data the process started with
+_status = {
+    "generation": 1,
+    "built_at": None,
+    "build_seconds": None,
+    "last_error": None,
+}
+# Sheets present in each workbook of the served generation
+_present_sheets = {}
+_rejected = None
+_rebuild = None
+_reload_lock = threading.Lock()
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+
+def watch(path, sheets, columns, header=0, usecols=None, preload=True):
+    """Watch a workbook, requiring `columns` in each of `sheets` (names or positions) before reloading it.
+
+    `usecols` are the columns the indexes read from those sheets (None
+    for all of them), so warm-up can load each sheet the way it's read.
+    Sheets the indexes don't read through data_store are watched with
+    `preload=False`.
+    """
+    _sources.setdefault(os.path.abspath(path), []).append(
+        (tuple(sheets), header, tuple(columns), None if usecols is None else tuple(usecols), preload))
+
+
+def watched_sheets():
+    """(path, sheet, header, usecols) of every watched sheet warm-up preloads, in the order they were declared."""
+    return list(dict.fromkeys(
+        (path, sheet, header, usecols)
+        for path, sources in _sources.items()
+        for sheets, header, _, usecols, preload in sources if preload
+        for sheet in sheets
+    ))
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a data file, as of the generation being served or built."""
+    signatures = _building.get() or _served
+    if signatures is not None:
+        signature = signatures.get(os.path.abspath(path))
+        if signature is not None:
+            return signature
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _current_signatures():
+    signatures = {}
+    for path in _sources:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signatures[path] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+def validate(path):
+    """Return (sheet names, problems) for a watched workbook; it can be served when problems is empty."""
+    import pandas as pd
+
+    problems = []
+    with pd.ExcelFile(path) as workbook:
+        sheet_names = workbook.sheet_names
+        for sheets, header, columns, _, _ in _sources[path]:
+            for sheet in sheets:
+                name = sheet_names[sheet] if isinstance(sheet, int) and sheet < len(sheet_names) else sheet
+                if name not in sheet_names:
+                    # Only a sheet that used to be there counts as missing
+                    if name in _present_sheets.get(path, ()):
+                        problems.append(f"{os.path.basename(path)}: sheet '{name}' is missing")
+                    continue
+                found = {str(column).strip().upper() for column in workbook.parse(name, header=header, nrows=0).columns}
+                missing = [column for column in columns if column.upper() not in found]
+                if missing:
+                    problems.append(f"{os.path.basename(path)}: sheet '{name}' lacks {', '.join(missing)}")
+    return set(sheet_names), problems
+
+
+def reload(force=False):
+    """Validate changed workbooks and rebuild every index from them; return True if a new generation was published.
+
+    Nothing happens unless a watched file changed since the served
+    generation. Without `force`, files already rejected once aren't tried
+    again until they change.
+    """
+    global _served, _published, _rejected
+    with _reload_lock:
+        signatures = _current_signatures()
+        if not force and signatures == _rejected:
+            return False
+
+        baseline = _served if _served is not None else _published
+        changed = [path for path in signatures if baseline is None or signatures[path] != baseline.get(path)]
+        if not changed:
+            # The workbooks are back to (or still) the served ones
+            _rejected = None
+            _status["last_error"] = None
+            return False
+        present_sheets = dict(_present_sheets)
+        problems = []
+        for path in changed:
+            try:
+                present_sheets[path], path_problems = validate(path)
+            except Exception as e:
+                path_problems = [f"{os.path.basename(path)}: {e}"]
+            problems.extend(path_problems)
+        if problems:
+            _rejected = signatures
+            _status["last_error"] = "; ".join(problems)
+            log.error(f"Data reload rejected: {_status['last_error']}")
+            return False
+
+        started = time.perf_counter()
+        token = _building.set(signatures)
+        try:
+            if _rebuild is not None:
+                _rebuild()
+        except Exception as e:
+            _rejected = signatures
+            _status["last_error"] = str(e)
+            log.error(f"Data reload failed: {e}")
+            return False
+        finally:
+            _building.reset(token)
+
+        if DATA_RELOAD_INTERVAL > 0:
+            _served = signatures
+        _published = signatures
+        _present_sheets.update(present_sheets)
+        _rejected = None
+        _status.update(
+            generation=_status["generation"] + 1,
+            built_at=datetime.now().isoformat(timespec="seconds"),
+            build_seconds=round(time.perf_counter() - started, 3),
+            last_error=None,
+        )
+        log.info("Data generation %s built in %.2fs", _status["generation"], _status["build_seconds"])
+        return True
+
+
+def _watch():
+    global _present_sheets
+    # Let the worker's first requests through before reading any workbook
+    time.sleep(DATA_RELOAD_INTERVAL)
+    sheets = {}
+    for path in _served:
+        try:
+            sheets[path] = validate(path)[0]
+        except Exception as e:
+            log.warning(f"Unable to read {path}: {e}")
+    _present_sheets = sheets
+
+    previous = _served
+    while True:
+        time.sleep(DATA_RELOAD_INTERVAL)
+        signatures = _current_signatures()
+        # Wait for a file being copied in to stop changing
+        if signatures == previous and signatures != _served:
+            reload()
+        previous = signatures
+
+
+def start_watcher():
+    """Pin the data generation being served and start this process's watcher thread, once."""
+    global _served, _watcher_pid
+    if DATA_RELOAD_INTERVAL <= 0 or _watcher_pid == os.getpid():
+        return
+    with _watcher_lock:
+        if _watcher_pid == os.getpid():
+            return
+        _served = _current_signatures()
+        threading.Thread(target=_watch, name="data-reload", daemon=True).start()
+        _watcher_pid = os.getpid()
+
+
+def status():
+    """The served generation, when and how fast it was built, and the last reload error."""
+    return dict(_status, watching=_watcher_pid == os.getpid(), files={
+        os.path.basename(path): datetime.fromtimestamp(signature[0] / 1e9).isoformat(timespec="seconds")
+        for path, signature in (_served or _current_signatures()).items()
+    })
+
+
+def init_app(app, rebuild):
+    """Rebuild indexes with `rebuild()` on reload, starting the watcher with each worker's first request."""
+    global _rebuild, _published
+    _rebuild = rebuild
+    _published = _current_signatures()
+    app.before_request(start_watcher)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import click
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.getcwd(), "data")
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshot")
+MANIFEST_PATH = os.path.join(SNAPSHOT_DIR, "manifest.json")
+
+# Workbooks compiled into the snapshot and the header row each is read with;
+# student sheets are streamed into the data plane instead (see credit_index)
+SNAPSHOT_SOURCES = {
+    "updateddata3.xlsx": 0,
+    "mldata.xlsx": 0,
+    "curriculum.xlsx": 1,
+    "credits.xlsx": 0,
+}
+
+_manifest = None
+_manifest_mtime = None
+_verified = {}
+_lock = threading.Lock()
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_snapshot(data_dir=DATA_DIR, snapshot_dir=SNAPSHOT_DIR):
+    """Parse every source workbook once and write pickled frames plus a manifest."""
+    import pandas as pd
+
+    staging_dir = snapshot_dir + ".tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    manifest = {"built_at": time.time(), "sources": {}}
+    for file_name, header in SNAPSHOT_SOURCES.items():
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            log.warning(f"Skipping missing workbook: {path}")
+            continue
+
+        started = time.perf_counter()
+        stat = os.stat(path)
+        sha256 = file_sha256(path)
+        sheets = pd.read_excel(path, sheet_name=None, header=header)
+
+        sheet_files = {}
+        for position, (sheet_name, df) in enumerate(sheets.items()):
+            frame_file = f"{os.path.splitext(file_name)[0]}-{position}.pkl"
+            with open(os.path.join(staging_dir, frame_file), "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            sheet_files[sheet_name] = frame_file
+
+        manifest["sources"][file_name] = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "header": header,
+            "sheets": sheet_files,
+            "sheet_order": list(sheet_files),
+        }
+        click.echo(f"Compiled {file_name}: {len(sheet_files)} sheets in {time.perf_counter() - started:.2f}s")
+
+    with open(os.path.join(staging_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the whole directory so readers never see a half-written snapshot
+    previous_dir = snapshot_dir + ".old"
+    shutil.rmtree(previous_dir, ignore_errors=True)
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, previous_dir)
+    os.replace(staging_dir, snapshot_dir)
+    shutil.rmtree(previous_dir, ignore_errors=True)
+    return manifest
+
+
+def _load_manifest():
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        _manifest, _manifest_mtime = None, None
+        return None
+
+    if mtime != _manifest_mtime:
+        with open(MANIFEST_PATH) as f:
+            _manifest = json.load(f)
+        _manifest_mtime = mtime
+        _verified.clear()
+    return _manifest
+
+
+def _is_fresh(path, source):
+    """Check a workbook against its manifest entry, hashing only when mtime/size moved."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if signature == (source["mtime_ns"], source["size"]):
+        return True
+    if stat.st_size != source["size"]:
+        return False
+
+    # A checkout or copy can touch the mtime without changing the content
+    if signature not in _verified:
+        _verified[signature] = file_sha256(path) == source["sha256"]
+    return _verified[signature]
+
+
+def covers(path, header=0):
+    """Whether the snapshot is up to date with a workbook read with this header row."""
+    with _lock:
+        manifest = _load_manifest()
+        if manifest is None:
+            return False
+        source = manifest["sources"].get(os.path.basename(path))
+        return source is not None and source["header"] == header and _is_fresh(path, source)
+
+
+def is_current(data_dir=DATA_DIR):
+    """Whether the snapshot is up to date with every source workbook under data_dir."""
+    for file_name, header in SNAPSHOT_SOURCES.items():
+        path = os.path.join(data_dir, file_name)
+        if os.path.exists(path) and not covers(path, header):
+            return False
+    return True
+
+
+def load_sheet(path, sheet_name=0, header=0):
+    """Return a sheet from the snapshot, or None if the snapshot can't serve it.
+
+    Raises ValueError for a sheet the up-to-date snapshot doesn't contain,
+    just like pd.read_excel would.
+    """
+    with _lock:
+        manifest = _load_manifest()
+        if manifest is None:
+            return None
+        source = manifest["sources"].get(os.path.basename(path))
+        if source is None or source["header"] != header or not _is_fresh(path, source):
+            return None
+
+    if isinstance(sheet_name, int):
+        if sheet_name >= len(source["sheet_order"]):
+            raise ValueError(f"Worksheet index {sheet_name} is invalid")
+        sheet_name = source["sheet_order"][sheet_name]
+    frame_file = source["sheets"].get(sheet_name)
+    if frame_file is None:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, frame_file), "rb") as f:
+            return pickle.load(f)
+    except OSError:
+        # The snapshot is being rebuilt; read the workbook instead
+        return None
+
+
+@click.command("build-data")
+def build_data_command():
+    """Compile the Excel workbooks under data/ into a fast-loading snapshot."""
+    manifest = build_snapshot()
+    click.echo(f"Snapshot written to {SNAPSHOT_DIR} ({len(manifest['sources'])} workbooks)")
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+import data_reload
+import data_snapshot
+import workbook_loader
+from instrumentation import phase
+from workbook_loader import column_filter, select_columns
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.getcwd(), "data")
+
+# Maximum number of (file, sheet, header, columns) frames kept in memory;
+# warm-up preloads every watched sheet, so this should exceed their count
+MAX_CACHED_SHEETS = int(os.environ.get("WORKBOOK_CACHE_SIZE", "64"))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+    "evictions": 0,
+    "snapshot_loads": 0,
+    "load_seconds": 0.0,
+}
+
+
+def _file_signature(path):
+    """Return the (mtime, size) pair used to detect a replaced workbook."""
+    return data_reload.file_signature(path)
+
+
+def _store(key, result):
+    """Cache a parsed sheet (or the ValueError reading it raised); call with _cache_lock held."""
+    _cache[key] = result
+    _cache.move_to_end(key)
+    while len(_cache) > MAX_CACHED_SHEETS:
+        _cache.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+def read_excel(path, sheet_name=0, header=0, usecols=None):
+    """Return a worksheet as a DataFrame, parsing the workbook only when it changed.
+
+    Sheets come from the compiled snapshot (see data_snapshot) while it is
+    up to date with the workbook, and from the .xlsx file otherwise.
+    `usecols` limits the frame to the named columns (see
+    workbook_loader.select_columns).
+
+    Callers get their own copy, so renaming columns or adding helper
+    columns never leaks into the cached frame.
+    """
+    # Every version of a sheet is its own entry, so the version being
+    # served stays cached while a reload builds from the new one.
+    key = (os.path.abspath(path), sheet_name, header, usecols, _file_signature(path))
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            if isinstance(entry, Exception):
+                raise ValueError(*entry.args)
+            return entry.copy()
+        _stats["misses"] += 1
+        if any(cached[:4] == key[:4] for cached in _cache):
+            _stats["invalidations"] += 1
+
+    # A missing sheet is remembered too, so a bad mapping doesn't reparse
+    # the whole workbook on every request.
+    started = time.perf_counter()
+    from_snapshot = False
+    try:
+        with phase("excel_load"):
+            result = data_snapshot.load_sheet(path, sheet_name=sheet_name, header=header)
+            from_snapshot = result is not None
+            if from_snapshot:
+                result = select_columns(result, usecols)
+            else:
+                import pandas as pd
+                result = pd.read_excel(path, sheet_name=sheet_name, header=header, usecols=column_filter(usecols))
+    except ValueError as e:
+        result = e
+    elapsed = time.perf_counter() - started
+
+    with _cache_lock:
+        _stats["load_seconds"] += elapsed
+        _stats["snapshot_loads"] += from_snapshot
+        _store(key, result)
+
+    if isinstance(result, Exception):
+        raise result
+    return result.copy()
+
+
+def preload(sheets, workers=None):
+    """Parse (path, sheet, header, usecols) sheets into the cache together, across worker processes.
+
+    Warm-up and data reloads call this before the indexes read the same
+    sheets one by one. Sheets already cached, or that an up-to-date
+    snapshot serves, are left to read_excel. Returns the per-sheet timing
+    report of workbook_loader.parse_sheets.
+    """
+    pending = []
+    for path, sheet_name, header, usecols in sheets:
+        path = os.path.abspath(path)
+        if not os.path.exists(path) or data_snapshot.covers(path, header):
+            continue
+        key = (path, sheet_name, header, usecols, _file_signature(path))
+        with _cache_lock:
+            if key not in _cache:
+                pending.append(key)
+    if not pending:
+        return []
+    if len(pending) > MAX_CACHED_SHEETS:
+        log.warning(f"Preloading {len(pending)} sheets into a cache of {MAX_CACHED_SHEETS}; raise WORKBOOK_CACHE_SIZE")
+
+    started = time.perf_counter()
+    try:
+        results, report = workbook_loader.parse_sheets([key[:4] for key in pending], workers)
+    except (BrokenProcessPool, ChildProcessError):
+        # The pool itself failed; that is a bug to surface, not a bad workbook
+        raise
+    except Exception as e:
+        # read_excel will hit (and report) the same error sheet by sheet
+        log.warning(f"Unable to preload workbooks: {e}")
+        return []
+    elapsed = time.perf_counter() - started
+
+    with _cache_lock:
+        _stats["load_seconds"] += elapsed
+        for key in pending:
+            _store(key, results[key[:4]])
+    log.info("Parsed %d sheets in %.2fs (%.2fs of parsing)", len(report), elapsed,
+             sum(entry["seconds"] for entry in report))
+    return report
+
+
+def data_version():
+    """Return a short token that changes whenever any workbook under data/ changes."""
+    signatures = []
+    for file_name in sorted(os.listdir(DATA_DIR)):
+        if file_name.endswith(".xlsx"):
+            signatures.append((file_name,) + _file_signature(os.path.join(DATA_DIR, file_name)))
+    return hashlib.sha1(repr(signatures).encode()).hexdigest()[:12]
+
+
+def cache_stats():
+    """Return hit/miss/load-time counters for the workbook cache."""
+    with _cache_lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_cache)
+    stats["max_entries"] = MAX_CACHED_SHEETS
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def clear_cache():
+    """Drop every cached worksheet."""
+    with _cache_lock:
+        _cache.clear()
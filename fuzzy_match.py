@@ -0,0 +1,197 @@
+"""Fuzzy string scoring on RapidFuzz.
+
+The scorers here reproduce fuzzywuzzy's ratio/partial_ratio/WRatio results
+exactly (fuzzywuzzy's partial_ratio uses a matching-block heuristic, so
+RapidFuzz's own scorers can return different numbers). RapidFuzz's native,
+vectorised scorers never score lower than these, so ChoiceSet uses them via
+process.cdist as an upper bound and only rescores the few choices that can
+still clear the cutoff.
+"""
+import re
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Indel, Levenshtein
+
+_NON_WORD = re.compile(r"(?ui)\W")
+_LATIN1_UPPER_HALF = {i: None for i in range(128, 256)}
+
+# fuzzywuzzy rounds each component before scaling, so an exact score can sit
+# up to one point above the unrounded bound.
+_ROUNDING_SLACK = 1.0
+
+
+def full_process(s, force_ascii=False):
+    """Lower-case, replace non-alphanumerics with spaces and trim (fuzzywuzzy.utils.full_process)."""
+    if force_ascii:
+        s = s.translate(_LATIN1_UPPER_HALF)
+    return _NON_WORD.sub(" ", s).lower().strip()
+
+
+def _intr(n):
+    return int(round(n))
+
+
+def ratio(s1, s2):
+    if s1 == s2:
+        return 100
+    if not s1 or not s2:
+        return 0
+    return _intr(100 * Indel.normalized_similarity(s1, s2))
+
+
+def partial_ratio(s1, s2):
+    if s1 == s2:
+        return 100
+    if not s1 or not s2:
+        return 0
+
+    shorter, longer = (s1, s2) if len(s1) <= len(s2) else (s2, s1)
+    scores = []
+    for block in Levenshtein.opcodes(shorter, longer).as_matching_blocks():
+        long_start = max(block.b - block.a, 0)
+        long_substr = longer[long_start:long_start + len(shorter)]
+        r = Indel.normalized_similarity(shorter, long_substr)
+        if r > .995:
+            return 100
+        scores.append(r)
+    return _intr(100 * max(scores))
+
+
+def _sort_tokens(s):
+    return " ".join(sorted(s.split())).strip()
+
+
+def _token_sort(s1, s2, partial):
+    ratio_func = partial_ratio if partial else ratio
+    return ratio_func(_sort_tokens(s1), _sort_tokens(s2))
+
+
+def _token_set(s1, s2, partial):
+    if s1 == s2:
+        return 100
+    if not s1 or not s2:
+        return 0
+
+    tokens1 = set(s1.split())
+    tokens2 = set(s2.split())
+    sorted_sect = " ".join(sorted(tokens1 & tokens2))
+    combined_1to2 = (sorted_sect + " " + " ".join(sorted(tokens1 - tokens2))).strip()
+    combined_2to1 = (sorted_sect + " " + " ".join(sorted(tokens2 - tokens1))).strip()
+    sorted_sect = sorted_sect.strip()
+
+    ratio_func = partial_ratio if partial else ratio
+    return max(
+        ratio_func(sorted_sect, combined_1to2),
+        ratio_func(sorted_sect, combined_2to1),
+        ratio_func(combined_1to2, combined_2to1),
+    )
+
+
+def WRatio(p1, p2):
+    """Weighted ratio of two strings already passed through full_process(force_ascii=True)."""
+    if not p1 or not p2:
+        return 0
+
+    partial_scale = .90
+    base = ratio(p1, p2)
+    len_ratio = float(max(len(p1), len(p2))) / min(len(p1), len(p2))
+    if len_ratio > 8:
+        partial_scale = .6
+
+    if len_ratio < 1.5:
+        tsor = _token_sort(p1, p2, partial=False) * .95
+        tser = _token_set(p1, p2, partial=False) * .95
+        return _intr(max(base, tsor, tser))
+
+    partial = partial_ratio(p1, p2) * partial_scale
+    ptsor = _token_sort(p1, p2, partial=True) * .95 * partial_scale
+    ptser = _token_set(p1, p2, partial=True) * .95 * partial_scale
+    return _intr(max(base, partial, ptsor, ptser))
+
+
+class ChoiceSet:
+    """A fixed list of choices pre-processed once for repeated fuzzy scoring."""
+
+    def __init__(self, choices, force_ascii=False):
+        self.choices = list(choices)
+        self.force_ascii = force_ascii
+        self.processed = [full_process(choice, force_ascii=force_ascii) for choice in self.choices]
+        self.lengths = np.array([len(choice) for choice in self.processed], dtype=float)
+
+    def __len__(self):
+        return len(self.choices)
+
+    def _cdist(self, queries, scorer, score_cutoff):
+        return process.cdist(queries, self.processed, scorer=scorer, score_cutoff=score_cutoff,
+                             dtype=np.float64, workers=1)
+
+    def extract(self, query, limit=5, threshold=60):
+        """Top `limit` choices by partial_ratio scoring above `threshold`.
+
+        Same choices and order as fuzzywuzzy's process.extract followed by
+        a `score > threshold` filter.
+        """
+        if not self.choices:
+            return []
+        query = full_process(query, force_ascii=self.force_ascii)
+        if not query:
+            candidates = np.arange(len(self.choices))
+            bounds = np.full(len(self.choices), 100.0)
+        else:
+            cutoff = threshold + 0.5
+            bounds = self._cdist([query], fuzz.partial_ratio, cutoff)[0]
+            candidates = np.flatnonzero(bounds >= cutoff)
+            candidates = candidates[np.argsort(-bounds[candidates], kind="stable")]
+
+        scored = []
+        for i in candidates:
+            if len(scored) >= limit and _intr(bounds[i]) < scored[limit - 1][0]:
+                break
+            scored.append((partial_ratio(query, self.processed[i]), i))
+            scored.sort(key=lambda item: -item[0])
+
+        # Ties keep the original choice order, as heapq.nlargest does
+        best = sorted(scored, key=lambda item: (-item[0], item[1]))[:limit]
+        return [(self.choices[i], score) for score, i in best if score > threshold]
+
+    def wratio_bounds(self, queries):
+        """Upper bounds of WRatio for each (query, choice) pair, as a matrix."""
+        queries = [full_process(query, force_ascii=True) for query in queries]
+        query_lengths = np.array([max(len(query), 1) for query in queries], dtype=float)[:, None]
+        lengths = np.maximum(self.lengths, 1)[None, :]
+        len_ratio = np.maximum(query_lengths, lengths) / np.minimum(query_lengths, lengths)
+        partial_scale = np.where(len_ratio > 8, .6, .9)
+
+        base = self._cdist(queries, fuzz.ratio, None)
+        token = np.maximum(self._cdist(queries, fuzz.token_sort_ratio, None),
+                           self._cdist(queries, fuzz.token_set_ratio, None)) * .95
+        partial = np.maximum(self._cdist(queries, fuzz.partial_ratio, None),
+                             np.maximum(self._cdist(queries, fuzz.partial_token_sort_ratio, None),
+                                        self._cdist(queries, fuzz.partial_token_set_ratio, None)) * .95) * partial_scale
+        bounds = np.maximum(base, np.where(len_ratio < 1.5, token, partial))
+
+        empty_queries = np.array([not query for query in queries])[:, None]
+        empty_choices = np.array([not choice for choice in self.processed])[None, :]
+        bounds[empty_queries | empty_choices] = 0
+        return queries, bounds
+
+    def best_wratio(self, queries, score_cutoff):
+        """Best WRatio of each query against the choices, or None when below score_cutoff."""
+        if not self.choices:
+            return [None] * len(queries)
+        processed_queries, bounds = self.wratio_bounds(queries)
+
+        results = []
+        for query, row in zip(processed_queries, bounds):
+            best = None
+            candidates = np.flatnonzero(row >= score_cutoff - _ROUNDING_SLACK)
+            for i in candidates[np.argsort(-row[candidates], kind="stable")]:
+                if best is not None and row[i] + _ROUNDING_SLACK < best:
+                    break
+                score = WRatio(query, self.processed[i])
+                if score >= score_cutoff and (best is None or score > best):
+                    best = score
+                    if best == 100:
+                        break
+            results.append(best)
+        return results
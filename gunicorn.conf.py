@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+
+# Bind to the platform-provided port when there is one
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# One process per core (plus one), each serving requests on several threads so a
+# slow matcher request never holds up other users' keystrokes.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Matcher jobs give up after MATCHER_TIMEOUT; this only catches a stuck worker
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app and build every data index once in the master; forked workers
+# then share those pages copy-on-write instead of each building their own.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def on_starting(server):
+    import data_snapshot
+
+    # The snapshot is gitignored, and files written in a release phase never
+    # reach the web processes, so compile it here on the machine that serves
+    if data_snapshot.is_current():
+        return
+    try:
+        data_snapshot.build_snapshot()
+    except Exception:
+        # Without a snapshot the sheets are parsed from the workbooks instead
+        server.log.exception("Unable to build the data snapshot")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import gc
+    from app import warm_up
+
+    warm_up()
+    # Keep the garbage collector from touching (and so copying) the preloaded objects
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import workbook_loader
+
+    # Each worker parses its own reloads; split the parsing processes between them
+    workbook_loader.share_workers(workers)
@@ -0,0 +1,191 @@
+"""Response caching for the JSON query endpoints and fingerprinted static files.
+
+The POST bodies of /credit_details, /get_completed_courses and
+/online_courses are queries: the response only depends on the payload and
+the workbooks, so finished responses are cached on (endpoint, normalized
+payload, data version) and served without running the view again. Each
+cached 200 carries a strong ETag of its body; a client repeating the query
+with that ETag in If-None-Match gets an empty 304 back.
+
+Static files are linked as /static/<file>?v=<content hash>. A fingerprinted
+URL changes whenever the file does, so its response may be cached for a
+year; anything requested without the fingerprint (images referenced from
+the CSS) gets STATIC_MAX_AGE.
+
+Text responses of at least COMPRESS_MIN_BYTES are compressed with brotli
+(when installed) or gzip, whichever the client prefers. Streamed responses
+such as /online_courses/batch are compressed chunk by chunk, each flushed so
+that results still arrive as they are produced.
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+import data_store
+from result_cache import TTLCache
+
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE", "1") == "1"
+
+# Finished query responses by (endpoint, payload, data version)
+response_cache = TTLCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "600")),
+)
+
+# Seconds browsers may reuse static files requested without a fingerprint
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", "3600"))
+FINGERPRINTED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Static file path -> ((mtime_ns, size), content hash)
+_fingerprints = {}
+
+# Smallest body worth compressing, and the gzip and brotli levels used
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "text/csv", "text/html", "text/plain"}
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def normalize_payload(payload):
+    """Canonical JSON of a request body, so key order and spacing don't split the cache."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_response(view):
+    """Serve a view's POST responses from response_cache, answering matching If-None-Match with 304.
+
+    Only responses below 500 are cached, so busy and timeout errors are
+    retried. Every cached 200 has a strong ETag and "Cache-Control:
+    no-cache": a client may keep it but must revalidate.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != "POST" or not RESPONSE_CACHE_ENABLED:
+            return view(*args, **kwargs)
+
+        key = (request.endpoint, normalize_payload(request.get_json(silent=True)), data_store.data_version())
+        entry = response_cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code >= 500 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest() if response.status_code == 200 else None
+            entry = (body, response.status_code, response.mimetype, etag)
+            response_cache.set(key, entry)
+
+        body, status, mimetype, etag = entry
+        if etag is None:
+            return Response(body, status=status, mimetype=mimetype)
+        # A compressed response's ETag names its encoding (see _compress);
+        # the 304 repeats whichever variant the client holds
+        for suffix in ("", "-br", "-gzip"):
+            if request.if_none_match.contains(f"{etag}{suffix}"):
+                return _not_modified(f"{etag}{suffix}")
+        response = Response(body, status=status, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
+
+
+def static_fingerprint(filename):
+    """Short content hash of a file under the static folder, or None if it doesn't exist."""
+    path = os.path.join(current_app.static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _fingerprints.get(path)
+    if cached is None or cached[0] != signature:
+        with open(path, "rb") as f:
+            cached = _fingerprints[path] = (signature, hashlib.sha1(f.read()).hexdigest()[:12])
+    return cached[1]
+
+
+def _fingerprint_static_urls(endpoint, values):
+    if endpoint == "static" and "v" not in values and "filename" in values:
+        fingerprint = static_fingerprint(values["filename"])
+        if fingerprint is not None:
+            values["v"] = fingerprint
+
+
+def _static_cache_headers(response):
+    if request.endpoint == "static" and response.status_code in (200, 304):
+        if request.args.get("v"):
+            response.headers["Cache-Control"] = FINGERPRINTED_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}"
+    return response
+
+
+def _compress_chunks(chunks, encoding):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for chunk in chunks:
+            data = compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _compress(response):
+    if (response.mimetype not in COMPRESSIBLE_TYPES or response.direct_passthrough
+            or response.content_encoding or response.status_code not in (200, 400, 404)):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_chunks(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        if encoding == "br":
+            response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(body, GZIP_LEVEL))
+    response.content_encoding = encoding
+    etag, weak = response.get_etag()
+    if etag is not None:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+def init_app(app):
+    """Fingerprint url_for('static', ...) links, set Cache-Control on static responses and compress text responses."""
+    app.url_defaults(_fingerprint_static_urls)
+    app.after_request(_static_cache_headers)
+    app.after_request(_compress)
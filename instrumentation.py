@@ -0,0 +1,246 @@
+"""Per-request phase timings, Prometheus metrics and opt-in slow-request profiling.
+
+Code on the hot path wraps its work in `phase("...")`; the time is added to
+the current request (including work handed to the matcher pool, which runs
+in a copy of the request's context) and to a histogram served at /metrics.
+"""
+import contextvars
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request
+from json_provider import provider_class
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+log = logging.getLogger(__name__)
+
+# Phases timed within a request
+PHASES = ("excel_load", "index_lookup", "tfidf", "fuzzy", "serialize")
+
+# Histogram buckets in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Response size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Fraction of requests profiled (0 disables profiling) and the duration, in
+# milliseconds, above which a profiled request's report is written out
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "200"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.getcwd(), "profiles"))
+
+_current = contextvars.ContextVar("request_timings", default=None)
+_active_phase = contextvars.ContextVar("active_phase", default=None)
+
+
+class Histogram:
+    """A labelled Prometheus histogram."""
+
+    def __init__(self, name, documentation, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in series:
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to produce a response.", ("endpoint", "method", "status"))
+PHASE_DURATION = Histogram(
+    "request_phase_duration_seconds", "Time spent per request in each phase.", ("endpoint", "phase"))
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size as sent, streamed responses excluded.",
+    ("endpoint", "encoding"), buckets=SIZE_BUCKETS)
+
+# Callables returning {metric_name: value} gauges, added to every /metrics scrape
+_collectors = []
+
+
+def register_collector(collector):
+    """Add a callable whose {name: value} results are exported as gauges."""
+    _collectors.append(collector)
+
+
+@contextmanager
+def phase(name):
+    """Time a block as one of PHASES, attributing it to the current request if any.
+
+    Phases are exclusive: time spent in a nested phase (an Excel load
+    during an index lookup, say) is only counted for the inner one.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    parent = _active_phase.get()
+    started = time.perf_counter()
+    if parent is not None:
+        timings[parent[0]] = timings.get(parent[0], 0.0) + started - parent[1]
+    frame = [name, started]
+    token = _active_phase.set(frame)
+    try:
+        yield
+    finally:
+        finished = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + finished - frame[1]
+        _active_phase.reset(token)
+        if parent is not None:
+            parent[1] = finished
+
+
+def current_context():
+    """Context to run request work in on another thread, so its phases are still counted."""
+    return contextvars.copy_context()
+
+
+def is_profiling():
+    """True while the current request is being profiled."""
+    timings = _current.get()
+    return timings is not None and timings.get("_profiler") is not None
+
+
+class TimedJSONProvider(provider_class()):
+    """The configured JSON provider with serialization timed as the "serialize" phase."""
+
+    def dumps(self, obj, **kwargs):
+        with phase("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+def _start_profiler():
+    if SamplingProfiler is not None:
+        profiler = SamplingProfiler()
+        profiler.start()
+        return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _dump_profile(profiler, elapsed):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{(request.endpoint or 'unknown').replace('.', '_')}-{elapsed * 1000:.0f}ms"
+    if SamplingProfiler is not None and isinstance(profiler, SamplingProfiler):
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, stem + ".html")
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, stem + ".txt")
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(40)
+        with open(path, "w") as f:
+            f.write(f"{request.method} {request.full_path}\n{report.getvalue()}")
+    log.warning("Slow request %s took %.0fms, profile written to %s", request.path, elapsed * 1000, path)
+
+
+def _before_request():
+    timings = {}
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        timings["_profiler"] = _start_profiler()
+    g.request_started = time.perf_counter()
+    g.request_timings = timings
+    g.request_timings_token = _current.set(timings)
+
+
+def _after_request(response):
+    timings = g.get("request_timings")
+    if timings is None:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or "unknown"
+    REQUEST_DURATION.observe(elapsed, endpoint, request.method, str(response.status_code))
+    if not response.is_streamed and response.content_length is not None:
+        RESPONSE_SIZE.observe(response.content_length, endpoint, response.content_encoding or "identity")
+
+    server_timing = []
+    for name in PHASES:
+        if name in timings:
+            PHASE_DURATION.observe(timings[name], endpoint, name)
+            server_timing.append(f"{name};dur={timings[name] * 1000:.2f}")
+    if server_timing:
+        response.headers["Server-Timing"] = ", ".join(server_timing)
+
+    profiler = timings.pop("_profiler", None)
+    if profiler is not None:
+        if elapsed * 1000 >= PROFILE_SLOW_MS:
+            _dump_profile(profiler, elapsed)
+        elif isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        else:
+            profiler.stop()
+    return response
+
+
+def _teardown_request(exc):
+    token = g.pop("request_timings_token", None)
+    if token is not None:
+        _current.reset(token)
+
+
+def render_metrics():
+    """All histograms and registered gauges in the Prometheus text format."""
+    lines = REQUEST_DURATION.render() + PHASE_DURATION.render() + RESPONSE_SIZE.render()
+    for collector in _collectors:
+        try:
+            values = collector()
+        except Exception as e:
+            log.error(f"Metrics collector failed: {e}")
+            continue
+        for name, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """Install request timing, JSON serialization timing and profiling on an app."""
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,75 @@
+"""JSON serialization of responses, with orjson when it is installed.
+
+Responses are built from pandas rows, so they may hold numpy scalars and
+arrays; both providers serialize those as plain numbers and lists, and
+pandas' missing-value markers as null. Keys keep their insertion order and
+output is always compact.
+
+JSON_PROVIDER selects "orjson" (the default, falling back to "default"
+when orjson isn't installed) or "default", Flask's provider on the
+standard json module.
+"""
+import logging
+import os
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+JSON_PROVIDER = os.environ.get("JSON_PROVIDER", "orjson")
+
+
+def _default(o):
+    """Serialize what neither json nor orjson handle themselves."""
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if type(o).__name__ in ("NaTType", "NAType"):
+        return None
+    return DefaultJSONProvider.default(o)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask's provider, compact and unsorted, with numpy values converted."""
+
+    default = staticmethod(_default)
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        # `compact` only reaches response(); streamed NDJSON lines come through here
+        if not kwargs.get("indent"):
+            kwargs.setdefault("separators", (",", ":"))
+        return super().dumps(obj, **kwargs)
+
+
+class OrjsonProvider(NumpyJSONProvider):
+    """orjson-backed provider; numpy arrays and scalars are serialized natively."""
+
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        option = self.OPTIONS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys"):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def provider_class():
+    """The provider class JSON_PROVIDER selects."""
+    if JSON_PROVIDER == "orjson":
+        if orjson is not None:
+            return OrjsonProvider
+        log.warning("orjson is not installed, serializing JSON with the json module")
+    return NumpyJSONProvider
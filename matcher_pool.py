@@ -0,0 +1,106 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import instrumentation
+from result_cache import TTLCache
+
+# Threads per server process that run course matching; RapidFuzz and the
+# sparse TF-IDF products release the GIL, so these scale across cores.
+MATCHER_THREADS = int(os.environ.get("MATCHER_THREADS", str(min(4, os.cpu_count() or 1))))
+
+# Matching jobs admitted at once (running or queued); more are turned away
+MATCHER_MAX_PENDING = int(os.environ.get("MATCHER_MAX_PENDING", str(MATCHER_THREADS * 4)))
+
+# Seconds a request waits for its matching result before giving up
+MATCHER_TIMEOUT = float(os.environ.get("MATCHER_TIMEOUT", "5"))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MATCHER_MAX_PENDING)
+
+# Latest autocomplete sequence number seen per client
+_latest_requests = TTLCache(max_entries=4096, ttl=60)
+_latest_lock = threading.Lock()
+
+
+class MatcherBusy(Exception):
+    """Raised when the matcher pool is already at its concurrency cap."""
+
+
+class MatcherTimeout(Exception):
+    """Raised when a matching job doesn't finish within the request timeout."""
+
+
+class MatcherCancelled(Exception):
+    """Raised when a newer request from the same client superseded this one."""
+
+
+def _get_executor():
+    """Return this process's pool, created on first use so forked workers never inherit a dead one."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=MATCHER_THREADS, thread_name_prefix="matcher")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def run_matcher(fn, *args, timeout=None, is_stale=None):
+    """Run fn(*args) on the matcher pool and return its result.
+
+    The job runs in a copy of the caller's context, so its phase timings
+    count towards the calling request. It is skipped if `is_stale()` turns
+    true before a thread picks it up. A job that times out keeps its slot until it actually finishes, so
+    the cap always reflects the real load on the pool.
+    """
+    timeout = MATCHER_TIMEOUT if timeout is None else timeout
+    # A profiled request does its matching inline so the profile covers it
+    if instrumentation.is_profiling():
+        return fn(*args)
+    if not _slots.acquire(blocking=False):
+        raise MatcherBusy()
+
+    def job():
+        if is_stale is not None and is_stale():
+            raise MatcherCancelled()
+        return fn(*args)
+
+    try:
+        future = _get_executor().submit(instrumentation.current_context().run, job)
+    except RuntimeError:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise MatcherTimeout()
+
+
+def start_request(client_id, seq):
+    """Record an autocomplete request and return a check for whether it went stale."""
+    if not client_id or seq is None:
+        return None
+    with _latest_lock:
+        latest = _latest_requests.get(client_id)
+        if latest is None or seq > latest:
+            _latest_requests.set(client_id, seq)
+
+    def is_stale():
+        latest = _latest_requests.get(client_id)
+        return latest is not None and latest > seq
+
+    return is_stale
+
+
+def pool_stats():
+    """Return the matcher pool configuration for /cache_stats."""
+    return {
+        "threads": MATCHER_THREADS,
+        "max_pending": MATCHER_MAX_PENDING,
+        "timeout": MATCHER_TIMEOUT,
+        "tracked_clients": len(_latest_requests),
+    }
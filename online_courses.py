@@ -1,219 +1,273 @@
-from flask import Blueprint, request, render_template, jsonify
-from datetime import datetime
-import pandas as pd
+from flask import Blueprint, Response, current_app, request, render_template, jsonify, stream_with_context, url_for
+import hashlib
+import json
+import logging
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from fuzzywuzzy import process 
+import time
+import data_reload
+import data_store
+from course_matcher import ELIGIBILITY_THRESHOLD, MATCH_ENGINE, get_alias_index, get_ngram_index, match_course_name
+from fuzzy_match import ChoiceSet, full_process
+from http_cache import FINGERPRINTED_CACHE_CONTROL, cached_response
+from instrumentation import phase
+from result_cache import SingleFlight, TTLCache, VersionedCache
+from registry import DEPARTMENTS, R2024_FIRST_JOIN_YEAR, cohort_for, eligibility_sheets
+from matcher_pool import MatcherBusy, MatcherCancelled, MatcherTimeout, run_matcher, start_request
 
 online_courses_bp = Blueprint('online_courses', __name__)
+log = logging.getLogger(__name__)
 
-# Department mappings
-DEPARTMENT_MAPPINGS = {
-    "23": "Artificial Intelligence and Data Science (AI&DS)",
-    "24": "Artificial Intelligence and Machine Learning (AIML)",
-    "10": "CSE (Cyber Security)",
-    "11": "CSE (Internet of Things)",
-    "01": "Computer Science and Engineering",
-    "22": "Information Technology"
-}
-
-# Sheet mappings for departments and regulations
-SHEET_MAPPINGS = {
-    "23": "AIDS-PC",
-    "24": "AIML-PC",
-    "10": "CS-PC",
-    "11": "IOT-PC",
-    "01": {
-        "R2019": "CSE-34-PC",
-        "R2024": "CSE-12-PC"
-    },
-    "22": {
-        "R2019": "IT-34-PC",
-        "R2024": "IT-12-PC"
-    }
-}
+# Upper bound on (reg_no, course_name) pairs per /online_courses/batch request
+MAX_BATCH_PAIRS = 2000
+
+# Course names scored per matcher job in a batch, so each job stays well inside MATCHER_TIMEOUT
+BATCH_MATCH_CHUNK = int(os.environ.get("BATCH_MATCH_CHUNK", "200"))
+
+# Autocomplete results per normalized query, shared by every user typing it
+suggestion_cache = TTLCache(
+    max_entries=int(os.environ.get("AUTOCOMPLETE_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("AUTOCOMPLETE_CACHE_TTL", "600")),
+)
+suggestion_flights = SingleFlight()
+
+# Seconds an uncached autocomplete request waits for a newer keystroke first
+AUTOCOMPLETE_DEBOUNCE = float(os.environ.get("AUTOCOMPLETE_DEBOUNCE", "0.1"))
 
 EXCEL_PATH = os.path.join(os.getcwd(), "data", "updateddata3.xlsx")
-MLDATA_PATH = os.path.join(os.getcwd(), "data", "mldata.xlsx")
-print("Loading file from:", MLDATA_PATH)
-
-if os.path.exists(MLDATA_PATH):
-    print("File found!")
-else:
-    print("File not found!")
-
-# Utility Functions
-def get_student_year(admission_year):
-    """Calculate student's current year of study based on admission year."""
-    current_year = datetime.now().year % 100
-    try:
-        admission_year = int(admission_year)
-        if admission_year < 10 or admission_year > current_year:
-            return "Invalid Year"
-    except ValueError:
-        return "Invalid Year"
-
-    student_year = current_year - admission_year + 1
-    return f"{student_year}{['th', 'st', 'nd', 'rd'][min(student_year, 3)]} Year" if 1 <= student_year <= 4 else "Graduated"
-
-def get_sheet_name(department_code, regulation):
-    """Get the correct sheet name based on department code and regulation."""
-    sheet_info = SHEET_MAPPINGS.get(department_code)
-    if isinstance(sheet_info, str):
-        return sheet_info
-    elif isinstance(sheet_info, dict):
-        return sheet_info.get(regulation)
-    return None
+
+# Columns read from the SCOFT online-course sheet
+SCOFT_COLUMNS = ("Course_Title", "Platform", "Course Code R2019", "Course Code R2024", "Credits",
+                 "Course Duration    (Minimum 12 weeks)", "LINKS")
+
+data_reload.watch(EXCEL_PATH, eligibility_sheets(), ["Course Title"], usecols=["Course Title"])
+data_reload.watch(EXCEL_PATH, ["Online Courses(SCOFT)"], ["Course_Title"], usecols=SCOFT_COLUMNS)
 
 def fetch_course_data(sheet_name, column_name):
     """Fetch course data from a specific sheet."""
     if not sheet_name:
-        print(f"[ERROR] Invalid sheet name: {sheet_name}")
+        log.error(f"Invalid sheet name: {sheet_name}")
         return []
     
     if not os.path.exists(EXCEL_PATH):
-        print("[ERROR] Excel file not found:", EXCEL_PATH)
+        log.error("Excel file not found: %s", EXCEL_PATH)
         return []
 
     try:
-        df = pd.read_excel(EXCEL_PATH, sheet_name=sheet_name)
+        df = data_store.read_excel(EXCEL_PATH, sheet_name=sheet_name, usecols=(column_name,))
         if column_name in df.columns:
             return df[column_name].dropna().str.strip().unique().tolist()
         else:
-            print(f"[ERROR] Column '{column_name}' not found in sheet '{sheet_name}'.")
+            log.error(f"Column '{column_name}' not found in sheet '{sheet_name}'.")
             return []
     except Exception as e:
-        print(f"[ERROR] Error fetching data from sheet {sheet_name}: {e}")
+        log.error(f"Error fetching data from sheet {sheet_name}: {e}")
         return []
 
-def match_course_name(input_name):
-    """Match course names using TF-IDF similarity and fuzzy matching."""
-    try:
-        df = pd.read_excel(MLDATA_PATH)
-        df.columns = df.columns.str.strip()
+class EligibilityIndex:
+    """Department courses expanded with their aliases, hashed for exact lookups."""
 
-        all_names = []
-        course_lookup = {}
+    def __init__(self, dept_courses, alias_index):
+        self.alias_index = alias_index
 
-        for _, row in df.iterrows():
-            standard_name = row['Standard Course Name']
-            aliases = row['Aliases'].split(', ') if pd.notna(row['Aliases']) else []
-            aliases1 = row['Aliases1'].split(', ') if pd.notna(row['Aliases1']) else []
+        # Normalize department sheet course names
+        dept_courses_lower = {course.lower(): course for course in dept_courses if isinstance(course, str)}
 
-            merged_aliases = list(set(aliases + aliases1))
-            all_names.extend(merged_aliases)
+        # Expand department courses with aliases
+        expanded_dept_courses = set(dept_courses_lower.keys())  # Start with department courses
+        for course in dept_courses_lower:
+            if course in alias_index.standard_to_aliases:
+                expanded_dept_courses.update(alias_index.standard_to_aliases[course])  # Add aliases for department courses
 
-            for alias in merged_aliases:
-                if alias.strip() and alias.strip() not in course_lookup:
-                    course_lookup[alias.strip()] = []
-                course_lookup[alias.strip()].append(standard_name)
+        # Choices are pre-processed the same way WRatio does, so identical
+        # processed strings are a guaranteed score of 100.
+        self.fuzzy_choices = ChoiceSet(expanded_dept_courses, force_ascii=True)
+        self.exact_courses = frozenset(choice for choice in self.fuzzy_choices.processed if choice)
 
-        if not all_names:
-            return []
+    def best_scores(self, course_names, score_cutoff=ELIGIBILITY_THRESHOLD):
+        """Return each course's best match score, or None where it is below score_cutoff."""
+        scores = [None] * len(course_names)
+        fuzzy_queries = []
+        for position, course_name in enumerate(course_names):
+            # Fix: Ensure input course name is correctly mapped to the standard name
+            course_name_lower = course_name.lower()
+            matched_standard_name = self.alias_index.alias_to_standard.get(course_name_lower, course_name_lower)
 
-        # TF-IDF Cosine Similarity Matching
-        vectorizer = TfidfVectorizer().fit_transform([input_name] + all_names)
-        similarity = cosine_similarity(vectorizer[0:1], vectorizer[1:])[0]
+            if full_process(matched_standard_name, force_ascii=True) in self.exact_courses:
+                scores[position] = 100
+            else:
+                fuzzy_queries.append((position, matched_standard_name))
 
-        # Lowered similarity threshold for broader matches
-        ranked_results = sorted(
-            [(all_names[i], similarity[i]) for i in range(len(similarity)) if similarity[i] >= 0.5],
-            key=lambda x: x[1], reverse=True
-        )
+        if fuzzy_queries:
+            with phase("fuzzy"):
+                fuzzy_scores = self.fuzzy_choices.best_wratio([query for _, query in fuzzy_queries], score_cutoff)
+            for (position, _), score in zip(fuzzy_queries, fuzzy_scores):
+                scores[position] = score
+        return scores
 
-        matched_courses = []
-        for alias, _ in ranked_results:
-            matched_courses.extend(course_lookup.get(alias, []))
 
-        # Fuzzy Matching (Handles typos & near-matches)
-        fuzzy_matches = process.extract(input_name, all_names, limit=5, scorer=process.fuzz.partial_ratio)
-        for alias, score in fuzzy_matches:
-            if score > 60:  # Adjust threshold based on performance
-                matched_courses.extend(course_lookup.get(alias, []))
+_eligibility_indexes = VersionedCache()
 
-        return list(set(matched_courses))  # Remove duplicates
 
-    except Exception as e:
-        print(f"[ERROR] Error in matching course names: {e}")
-        return []
+def build_eligibility_index(sheet_name, alias_index):
+    dept_courses = fetch_course_data(sheet_name, "Course Title")
+    if not dept_courses:
+        return None
+    return EligibilityIndex(dept_courses, alias_index)
 
-def check_course_eligibility(reg_no, course_name):
-    """Check if a student is eligible for a given course, considering aliases and fuzzy matching."""
-    if not (len(reg_no) == 12 and reg_no.isdigit()):
-        return "Invalid Register Number"
 
-    department_code = reg_no[6:8]
-    join_year = reg_no[4:6]
-    regulation = "R2019" if int(join_year) <= 22 else "R2024"
+def get_eligibility_index(sheet_name):
+    """Return the eligibility index for a department sheet, rebuilt when the data changes."""
+    alias_index = get_alias_index()
+    version = (data_reload.file_signature(EXCEL_PATH), alias_index.signature)
+    return _eligibility_indexes.get(sheet_name, version, build_eligibility_index, sheet_name, alias_index)
 
+def resolve_eligibility_index(cohort):
+    """Return (index, None) for a student cohort, or (None, status) when it can't be checked."""
     # Get department-specific sheet
-    sheet_name = get_sheet_name(department_code, regulation)
+    sheet_name = cohort.eligibility_sheet
 
     if not sheet_name:
-        print(f"[ERROR] No sheet found for Department: {department_code}, Regulation: {regulation}")
-        return "Unknown Eligibility"
-
-    # Fetch department-specific courses
-    dept_courses = fetch_course_data(sheet_name, "Course Title")
-    
-    if not dept_courses:
-        return "Course data not available"
+        log.error(f"No sheet found for Department: {cohort.department_code}, Regulation: {cohort.regulation}")
+        return None, "Unknown Eligibility"
 
-    # Load aliases from mldata.xlsx
     try:
-        df = pd.read_excel(MLDATA_PATH)
-        df.columns = df.columns.str.strip()
-
-        alias_to_standard = {}  # Maps alias -> standard name
-        standard_to_aliases = {}  # Maps standard name -> set of aliases
-
-        for _, row in df.iterrows():
-            standard_name = row['Standard Course Name'].strip().lower()
-            aliases = row['Aliases'].split(', ') if pd.notna(row['Aliases']) else []
-            aliases1 = row['Aliases1'].split(', ') if pd.notna(row['Aliases1']) else []
-            
-            all_aliases = set(aliases + aliases1)
-            all_aliases.add(standard_name)  # Include standard name itself
-
-            standard_to_aliases[standard_name] = all_aliases
-
-            for alias in all_aliases:
-                alias_to_standard[alias.lower()] = standard_name
-
+        with phase("index_lookup"):
+            index = get_eligibility_index(sheet_name)
     except Exception as e:
-        print(f"[ERROR] Failed to load aliases: {e}")
-        return "Error loading course data"
-
-    # Normalize department sheet course names
-    dept_courses_lower = {course.lower(): course for course in dept_courses}
+        log.error(f"Failed to load aliases: {e}")
+        return None, "Error loading course data"
 
-    # Expand department courses with aliases
-    expanded_dept_courses = set(dept_courses_lower.keys())  # Start with department courses
-    for course in dept_courses_lower:
-        if course in standard_to_aliases:
-            expanded_dept_courses.update(standard_to_aliases[course])  # Add aliases for department courses
+    if index is None:
+        return None, "Course data not available"
+    return index, None
 
-    # Normalize input course name
-    course_name_lower = course_name.lower()
-    
-    # Fix: Ensure input course name is correctly mapped to the standard name
-    matched_standard_name = alias_to_standard.get(course_name_lower, course_name_lower)
+def eligibility_from_score(score):
+    # A match at or above the threshold is considered the same course
+    return "Not Eligible" if score is not None else "Eligible"
 
-    print(f"[DEBUG] Input course: {course_name} → Matched Standard Name: {matched_standard_name}")
+def check_course_eligibility(reg_no, course_name):
+    """Check if a student is eligible for a given course, considering aliases and fuzzy matching."""
+    cohort = cohort_for(reg_no)
+    if cohort is None:
+        return "Invalid Register Number"
 
-    # Use fuzzy matching to compare with department courses
-    best_match, score = process.extractOne(matched_standard_name, expanded_dept_courses)
+    index, status = resolve_eligibility_index(cohort)
+    if index is None:
+        return status
+
+    score = index.best_scores([course_name])[0]
+
+    log.debug("Input course: %s (Best Score: %s)", course_name, score)
+
+    return eligibility_from_score(score)
+
+_scoft_courses = VersionedCache()
+
+def load_scoft_courses():
+    scoft_df = data_store.read_excel(EXCEL_PATH, sheet_name="Online Courses(SCOFT)", usecols=SCOFT_COLUMNS)
+    by_title = {}
+    for _, row in scoft_df.iterrows():
+        title = row['Course_Title']
+        if isinstance(title, str):
+            by_title.setdefault(title.lower(), row.to_dict())
+    return by_title
+
+def get_scoft_courses():
+    """Return the SCOFT online-course rows keyed by lower-cased title, reloaded when the workbook changes."""
+    return _scoft_courses.get("scoft", data_reload.file_signature(EXCEL_PATH), load_scoft_courses)
+
+def get_scoft_course_details(course_name):
+    """Look up a course in the SCOFT online-course sheet by case-insensitive title."""
+    course_details = get_scoft_courses().get(course_name.lower())
+    if course_details is None:
+        return None
+    return {
+        "course_name": course_details.get('Course_Title', 'N/A'),
+        "platform": course_details.get('Platform', 'N/A'),
+        "course_code_R2019": course_details.get('Course Code R2019', 'N/A'),
+        "course_code_R2024": course_details.get('Course Code R2024', 'N/A'),
+        "credits": course_details.get('Credits', 'N/A'),
+        "duration": course_details.get('Course Duration    (Minimum 12 weeks)', 'N/A'),
+        "link": course_details.get('LINKS', 'N/A')
+    }
 
-    print(f"[DEBUG] Best Fuzzy Match: {best_match} (Score: {score})")
+def get_student_info(reg_no):
+    """Department, year and regulation of a register number, or None if it isn't a valid one."""
+    cohort = cohort_for(reg_no)
+    if cohort is None:
+        return None
+
+    return {
+        "reg_no": reg_no,
+        "department": cohort.department,
+        "student_year": cohort.student_year,
+        "regulation": cohort.regulation
+    }
 
-    # If match score is high (e.g., above 85), consider it the same course
-    if score >= 87:
-        return "Not Eligible"
+_alias_dictionaries = VersionedCache()
+
+def build_alias_dictionary(alias_index):
+    """(content hash, JSON body) of the alias dictionary the browser suggests courses from.
+
+    "courses" lists the standard course names, "aliases" every alias and
+    standard name with the positions of its courses in "courses", and
+    "departments" the courses of each department's eligibility sheet per
+    regulation, which the browser lists first as rank_for_student does.
+    """
+    targets = {}
+    for alias, names in alias_index.course_lookup.items():
+        targets.setdefault(alias, []).extend(names)
+    for names in list(targets.values()):
+        for name in names:
+            targets.setdefault(name, [name])
+    courses = sorted({name for names in targets.values() for name in names})
+    positions = {name: position for position, name in enumerate(courses)}
+
+    sheet_courses = {}
+    for sheet_name in eligibility_sheets():
+        index = get_eligibility_index(sheet_name)
+        if index is not None:
+            sheet_courses[sheet_name] = [position for position, name in enumerate(courses)
+                                         if full_process(name, force_ascii=True) in index.exact_courses]
+    departments = {
+        code: {regulation: sheet_courses.get(sheet_name, []) for regulation, sheet_name in department["eligibility_sheets"].items()}
+        for code, department in DEPARTMENTS.items()
+    }
 
-    return "Eligible"
+    body = json.dumps({
+        "courses": courses,
+        "aliases": [[alias, sorted({positions[name] for name in names})] for alias, names in sorted(targets.items())],
+        "departments": departments,
+        "r2024_first_join_year": R2024_FIRST_JOIN_YEAR,
+    }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(body).hexdigest()[:12], body
+
+def get_alias_dictionary():
+    """The current alias dictionary, rebuilt when mldata.xlsx or the eligibility sheets change."""
+    alias_index = get_alias_index()
+    version = (data_reload.file_signature(EXCEL_PATH), alias_index.signature)
+    return _alias_dictionaries.get("dictionary", version, build_alias_dictionary, alias_index)
+
+def warm_up():
+    """Build the alias index, every department's eligibility index and the SCOFT lookup ahead of traffic."""
+    if not os.path.exists(EXCEL_PATH):
+        log.warning("Course workbook not found: %s", EXCEL_PATH)
+    get_alias_index()
+    if MATCH_ENGINE == "ngram":
+        get_ngram_index()
+    for sheet_name in eligibility_sheets():
+        get_eligibility_index(sheet_name)
+    get_scoft_courses()
+    get_alias_dictionary()
+
+def busy_response():
+    """503 for a request turned away because the matcher pool is full."""
+    response = jsonify({"error": "The server is busy. Please try again."})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 @online_courses_bp.route('/online_courses', methods=['GET', 'POST'])
+@cached_response
 def online_courses():
     """Handle student details and course eligibility."""
     if request.method == 'POST':
@@ -222,68 +276,248 @@ def online_courses():
             reg_no = data.get('reg_no', '').strip()
             course_name = data.get('course_name', '').strip()
 
-            print(f"[DEBUG] Received reg_no: {reg_no}, course_name: {course_name}")
+            log.debug("Received reg_no: %s, course_name: %s", reg_no, course_name)
 
-            if not (len(reg_no) == 12 and reg_no.isdigit()):
+            response = get_student_info(reg_no)
+            if response is None:
                 return jsonify({"error": "Enter a valid 12-digit register number."}), 400
 
-            join_year = reg_no[4:6]
-            department_code = reg_no[6:8]
-
-            student_year = get_student_year(join_year)
-            regulation = "R2019" if int(join_year) <= 22 else "R2024"
-            department = DEPARTMENT_MAPPINGS.get(department_code, "Unknown Department")
-
-            response = {
-                "reg_no": reg_no,
-                "department": department,
-                "student_year": student_year,
-                "regulation": regulation
-            }
-
             if course_name:
-                eligibility = check_course_eligibility(reg_no, course_name)
+                eligibility = run_matcher(check_course_eligibility, reg_no, course_name)
                 response.update({"eligibility": eligibility})
                 
                 if eligibility == "Eligible":
-                    scoft_df = pd.read_excel(EXCEL_PATH, sheet_name="Online Courses(SCOFT)")
-                    course_row = scoft_df[scoft_df['Course_Title'].str.lower() == course_name.lower()]
-                    if not course_row.empty:
-                        course_details = course_row.iloc[0].to_dict()
-                        response.update({
-                            "course_name": course_details.get('Course_Title', 'N/A'),
-                            "platform": course_details.get('Platform', 'N/A'),
-                            "course_code_R2019": course_details.get('Course Code R2019', 'N/A'),
-                            "course_code_R2024": course_details.get('Course Code R2024', 'N/A'),
-                            "credits": course_details.get('Credits', 'N/A'),
-                            "duration": course_details.get('Course Duration    (Minimum 12 weeks)', 'N/A'),
-                            "link": course_details.get('LINKS', 'N/A')
-                        })
-
-            print("[DEBUG] Response:", response)
+                    with phase("index_lookup"):
+                        course_details = get_scoft_course_details(course_name)
+                    if course_details:
+                        response.update(course_details)
+
+            log.debug("Response: %s", response)
             return jsonify(response)
 
+        except MatcherBusy:
+            return busy_response()
+        except MatcherTimeout:
+            return jsonify({"error": "Checking eligibility took too long. Please try again."}), 504
         except Exception as e:
-            print(f"[ERROR] Error in online_courses: {e}")
+            log.error(f"Error in online_courses: {e}")
             return jsonify({"error": "An unexpected error occurred"}), 500
 
-    return render_template('online_courses.html')
+    try:
+        version, _ = get_alias_dictionary()
+        alias_dictionary_url = url_for('online_courses.alias_dictionary', version=version)
+    except Exception as e:
+        log.error(f"Unable to build the alias dictionary: {e}")
+        alias_dictionary_url = None
+    return render_template('online_courses.html', alias_dictionary_url=alias_dictionary_url)
+
+def parse_batch_pairs(data):
+    """Return the (reg_no, course_name) pairs of a batch request, or None if malformed.
+
+    Accepts either explicit pairs or every combination of reg_nos x course_names.
+    """
+    if not isinstance(data, dict):
+        return None
+    if "pairs" in data:
+        pairs = data["pairs"]
+        if not isinstance(pairs, list) or not all(isinstance(pair, dict) for pair in pairs):
+            return None
+        return [(str(pair.get("reg_no", "")).strip(), str(pair.get("course_name", "")).strip()) for pair in pairs]
+
+    reg_nos = data.get("reg_nos")
+    course_names = data.get("course_names")
+    if not isinstance(reg_nos, list) or not isinstance(course_names, list):
+        return None
+    return [(str(reg_no).strip(), str(course_name).strip()) for reg_no in reg_nos for course_name in course_names]
+
+def score_batch(index, course_names):
+    """Best scores of many course names, scored on the matcher pool BATCH_MATCH_CHUNK names per job.
+
+    Batch matching thereby counts against the pool's concurrency cap and
+    timeout like every other matching request.
+    """
+    scores = []
+    for start in range(0, len(course_names), BATCH_MATCH_CHUNK):
+        scores += run_matcher(index.best_scores, course_names[start:start + BATCH_MATCH_CHUNK])
+    return scores
+
+def check_batch_eligibility(pairs):
+    """Yield one result per (reg_no, course_name) pair, evaluated group by group.
+
+    Pairs are grouped by department/regulation so each group shares one
+    eligibility index and is scored in a single batch. Results carry the
+    pair's position in the request as "index" since they stream out of order.
+    """
+    groups = {}
+    for position, (reg_no, course_name) in enumerate(pairs):
+        cohort = cohort_for(reg_no)
+        if cohort is None:
+            yield {"index": position, "reg_no": reg_no, "course_name": course_name,
+                   "error": "Enter a valid 12-digit register number."}
+            continue
+        if not course_name:
+            yield {"index": position, "reg_no": reg_no, "error": "Enter a course name."}
+            continue
+        groups.setdefault((cohort.department_code, cohort.regulation), (cohort, []))[1].append(
+            (position, reg_no, course_name))
+
+    # A failing group or pair gets error records; the rest of the batch still streams
+    for cohort, members in groups.values():
+        error = None
+        try:
+            index, status = resolve_eligibility_index(cohort)
+            if index is not None:
+                scores = score_batch(index, [course_name for _, _, course_name in members])
+            else:
+                scores = [None] * len(members)
+        except MatcherBusy:
+            error = "The server is busy. Please try again."
+        except MatcherTimeout:
+            error = "Checking eligibility took too long. Please try again."
+        except Exception as e:
+            log.error(f"Error checking batch group {cohort.department_code}/{cohort.regulation}: {e}")
+            error = "An unexpected error occurred"
+        if error:
+            for position, reg_no, course_name in members:
+                yield {"index": position, "reg_no": reg_no, "course_name": course_name, "error": error}
+            continue
+
+        for (position, reg_no, course_name), score in zip(members, scores):
+            try:
+                yield batch_result(position, reg_no, course_name, status or eligibility_from_score(score))
+            except Exception as e:
+                log.error(f"Error checking batch pair {position}: {e}")
+                yield {"index": position, "reg_no": reg_no, "course_name": course_name,
+                       "error": "An unexpected error occurred"}
+
+def batch_result(position, reg_no, course_name, eligibility):
+    """The streamed record of one checked pair, with the SCOFT course details when eligible."""
+    result = {"index": position, **get_student_info(reg_no), "eligibility": eligibility}
+    if eligibility == "Eligible":
+        result.update(get_scoft_course_details(course_name) or {"course_name": course_name})
+    else:
+        result["course_name"] = course_name
+    return result
+
+@online_courses_bp.route('/online_courses/batch', methods=['POST'])
+def online_courses_batch():
+    """Check many (reg_no, course_name) pairs at once, streamed back as NDJSON."""
+    pairs = parse_batch_pairs(request.get_json(silent=True))
+    if pairs is None:
+        return jsonify({"error": "Send either 'pairs' or 'reg_nos' and 'course_names' lists."}), 400
+    if len(pairs) > MAX_BATCH_PAIRS:
+        return jsonify({"error": f"A batch may contain at most {MAX_BATCH_PAIRS} pairs."}), 400
+
+    def generate():
+        try:
+            for result in check_batch_eligibility(pairs):
+                yield current_app.json.dumps(result) + "\n"
+        except Exception as e:
+            log.error(f"Error in online_courses_batch: {e}")
+            yield current_app.json.dumps({"error": "An unexpected error occurred"}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def get_suggestions(query, is_stale=None):
+    """Suggestions for a query, served from the cache or computed once for all concurrent askers."""
+    # Matching only depends on the normalized query, so "Deep  learning!" and
+    # "deep learning" share an entry; the alias index signature keeps it current.
+    with phase("index_lookup"):
+        key = (full_process(query), get_alias_index().signature)
+        suggestions = suggestion_cache.get(key)
+    if suggestions is not None:
+        return suggestions
+
+    # Wait briefly for the client's next keystroke before doing any work
+    if is_stale is not None and AUTOCOMPLETE_DEBOUNCE > 0:
+        time.sleep(AUTOCOMPLETE_DEBOUNCE)
+        if is_stale():
+            raise MatcherCancelled()
+
+    def compute():
+        suggestions = suggestion_cache.peek(key)
+        if suggestions is None:
+            suggestions = run_matcher(match_course_name, query, is_stale=is_stale)
+            suggestion_cache.set(key, suggestions)
+        return suggestions
+
+    return suggestion_flights.do(key, compute)
+
+def narrow_from_prefix(query):
+    """Approximate suggestions from the longest cached prefix of the query, or None.
+
+    Extending a query can bring in matches its prefix didn't have, so this
+    is only a fallback for when the matcher can't answer in time.
+    """
+    normalized = full_process(query)
+    words = normalized.split()
+    signature = get_alias_index().signature
+    for end in range(len(normalized) - 1, 0, -1):
+        suggestions = suggestion_cache.peek((normalized[:end].strip(), signature))
+        if suggestions is not None:
+            # Keep courses with a word starting with each query word
+            return [
+                name for name in suggestions
+                if all(any(part.startswith(word) for part in full_process(name).split()) for word in words)
+            ]
+    return None
+
+def rank_for_student(suggestions, reg_no):
+    """Put courses from the student's department curriculum first, keeping the order otherwise."""
+    cohort = cohort_for(reg_no)
+    if cohort is None or not cohort.eligibility_sheet:
+        return suggestions
+    sheet_name = cohort.eligibility_sheet
+
+    # The department's eligibility index is already built and cached for /online_courses
+    try:
+        with phase("index_lookup"):
+            index = get_eligibility_index(sheet_name)
+    except Exception as e:
+        log.error(f"Unable to rank suggestions: {e}")
+        return suggestions
+    if index is None:
+        return suggestions
+    return sorted(suggestions, key=lambda name: full_process(name, force_ascii=True) not in index.exact_courses)
+
+@online_courses_bp.route('/autocomplete/dictionary/<version>.json', methods=['GET'])
+def alias_dictionary(version):
+    """The alias dictionary for client-side suggestions; a version's content never changes, so it is cached for good."""
+    current_version, body = get_alias_dictionary()
+    if version != current_version:
+        return jsonify({"error": "Unknown dictionary version"}), 404
+    response = Response(body, mimetype="application/json")
+    response.set_etag(version)
+    response.headers["Cache-Control"] = FINGERPRINTED_CACHE_CONTROL
+    return response.make_conditional(request)
 
 @online_courses_bp.route('/autocomplete', methods=['GET'])
 def autocomplete():
     """Provide course name suggestions based on user input."""
+    query = request.args.get('query', '').strip()
+    reg_no = request.args.get('reg_no', '').strip()
     try:
-        query = request.args.get('query', '').strip()
-        print(f"[DEBUG] Autocomplete Query: {query}")
+        log.debug("Autocomplete Query: %s", query)
 
         if not query:
             return jsonify({"suggestions": []})
 
-        suggestions = match_course_name(query)
-        print(f"[DEBUG] Suggestions: {suggestions}")
+        # Clients number their keystroke requests so older ones still queued can be dropped
+        is_stale = start_request(request.args.get('client_id', ''), request.args.get('seq', type=int))
+        suggestions = rank_for_student(get_suggestions(query, is_stale), reg_no)
+        log.debug("Suggestions: %s", suggestions)
 
         return jsonify({"suggestions": suggestions})
 
+    except MatcherCancelled:
+        return jsonify({"suggestions": [], "cancelled": True})
+    except (MatcherBusy, MatcherTimeout) as e:
+        suggestions = narrow_from_prefix(query)
+        if suggestions is not None:
+            return jsonify({"suggestions": rank_for_student(suggestions, reg_no), "approximate": True})
+        if isinstance(e, MatcherBusy):
+            return busy_response()
+        return jsonify({"error": "Unable to fetch suggestions"}), 504
     except Exception as e:
-        print(f"[ERROR] Error in autocomplete: {e}")
+        log.error(f"Error in autocomplete: {e}")
         return jsonify({"error": "Unable to fetch suggestions"}), 500
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""Department and regulation metadata, compiled once per (join year, department).
+
+Digits 5-6 of a register number are the join year and digits 7-8 the
+department code. Every blueprint resolves them through cohort_for(), a
+single dict lookup on those four digits, rather than decoding them and
+consulting the mapping tables itself.
+"""
+import threading
+from datetime import datetime
+
+UNKNOWN_DEPARTMENT = "Unknown Department"
+
+# Cohorts joining in or after this year follow R2024, earlier ones R2019
+# (matching the credit requirement sheets below)
+R2024_FIRST_JOIN_YEAR = 24
+
+# Per department: display name, eligibility sheet of updateddata3.xlsx per
+# regulation, sheet of student_credits.xlsx, sheet of curriculum.xlsx and
+# column of credits.xlsx
+DEPARTMENTS = {
+    "23": {
+        "name": "Artificial Intelligence and Data Science (AI&DS)",
+        "eligibility_sheets": {"R2019": "AIDS-PC", "R2024": "AIDS-PC"},
+        "student_sheet": "aids_courses",
+        "curriculum_sheet": "R2019-AI&DS",
+        "credit_column": "AIDS",
+    },
+    "24": {
+        "name": "Artificial Intelligence and Machine Learning (AIML)",
+        "eligibility_sheets": {"R2019": "AIML-PC", "R2024": "AIML-PC"},
+        "student_sheet": "aiml",
+        "curriculum_sheet": "AIML",
+        "credit_column": "AIML",
+    },
+    "10": {
+        "name": "CSE (Cyber Security)",
+        "eligibility_sheets": {"R2019": "CS-PC", "R2024": "CS-PC"},
+        "student_sheet": "CSE (Cyber Security)",
+        "curriculum_sheet": "CSE(CS)",
+        "credit_column": "CSC",
+    },
+    "11": {
+        "name": "CSE (Internet of Things)",
+        "eligibility_sheets": {"R2019": "IOT-PC", "R2024": "IOT-PC"},
+        "student_sheet": "CSE (Internet of Things)",
+        "curriculum_sheet": "CSE(IOT)",
+        "credit_column": "IOT",
+    },
+    "01": {
+        "name": "Computer Science and Engineering",
+        "eligibility_sheets": {"R2019": "CSE-34-PC", "R2024": "CSE-12-PC"},
+        "student_sheet": "Computer Science and Engineering",
+        "curriculum_sheet": "CSE",
+        "credit_column": "CS",
+    },
+    "22": {
+        "name": "Information Technology",
+        "eligibility_sheets": {"R2019": "IT-34-PC", "R2024": "IT-12-PC"},
+        "student_sheet": "Information Technology",
+        "curriculum_sheet": "IT",
+        "credit_column": "IT",
+    },
+}
+
+# Credit requirement sheet of credits.xlsx by join year
+CREDIT_SHEETS = {
+    21: "credit_details 19-1",
+    22: "credit details 19-2",
+    23: "credit details 19-2",
+    24: "credit details 24",
+}
+DEFAULT_CREDIT_SHEET = "credit details 24"
+
+_ORDINALS = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th"}
+
+
+def student_year(join_year, current_year):
+    """The year of study ("2nd Year"), "Graduated", or "Invalid Year" for an impossible join year."""
+    if join_year < 10 or join_year > current_year:
+        return "Invalid Year"
+    year = current_year - join_year + 1
+    return f"{_ORDINALS[year]} Year" if year in _ORDINALS else "Graduated"
+
+
+class Cohort:
+    """Everything derived from a register number's join year and department code."""
+
+    def __init__(self, join_year, department_code, current_year):
+        department = DEPARTMENTS.get(department_code, {})
+        self.join_year = join_year
+        self.department_code = department_code
+        self.department = department.get("name", UNKNOWN_DEPARTMENT)
+        self.regulation = "R2019" if join_year < R2024_FIRST_JOIN_YEAR else "R2024"
+        self.student_year = student_year(join_year, current_year)
+        # Sheet names, the keys of each blueprint's prepared indexes
+        self.eligibility_sheet = department.get("eligibility_sheets", {}).get(self.regulation)
+        self.student_sheet = department.get("student_sheet", UNKNOWN_DEPARTMENT)
+        self.curriculum_sheet = department.get("curriculum_sheet")
+        self.credit_sheet = CREDIT_SHEETS.get(join_year, DEFAULT_CREDIT_SHEET)
+        self.credit_column = department.get("credit_column", "")
+        self.course_code_column = f"Course Code {self.regulation}"
+
+
+_registry = (None, {})
+_registry_lock = threading.Lock()
+
+
+def _cohorts():
+    """Cohort of every "YYDD" register number digits, rebuilt when the calendar year (and so the year of study) changes."""
+    global _registry
+    current_year = datetime.now().year % 100
+    year, cohorts = _registry
+    if year != current_year:
+        with _registry_lock:
+            if _registry[0] != current_year:
+                _registry = (current_year, {
+                    f"{join_year:02d}{department:02d}": Cohort(join_year, f"{department:02d}", current_year)
+                    for join_year in range(100) for department in range(100)
+                })
+            year, cohorts = _registry
+    return cohorts
+
+
+def warm_up():
+    """Compile this year's cohorts ahead of the first request."""
+    _cohorts()
+
+
+def cohort_for(reg_no):
+    """Return the cohort of a 12-digit register number, or None if it isn't one."""
+    if not (len(reg_no) == 12 and reg_no.isascii() and reg_no.isdigit()):
+        return None
+    return _cohorts()[reg_no[4:8]]
+
+
+def cohort(department_code, join_year):
+    """Return the cohort of a department code and two-digit join year."""
+    return _cohorts()[f"{join_year:02d}{department_code}"]
+
+
+def eligibility_sheets():
+    """Every department eligibility sheet of updateddata3.xlsx."""
+    return sorted({sheet for department in DEPARTMENTS.values() for sheet in department["eligibility_sheets"].values()})
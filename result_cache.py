@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key, default=None):
+        """Like get, but without counting a hit or miss or refreshing recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return default
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into a single computation.
+
+    Only successful results are shared: if the call in flight fails, each
+    waiting caller runs the computation itself.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {"done": threading.Event(), "ok": False, "result": None}
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call["done"].wait()
+            if call["ok"]:
+                return call["result"]
+            return fn(*args)
+
+        try:
+            call["result"] = fn(*args)
+            call["ok"] = True
+            return call["result"]
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+
+class VersionedCache:
+    """Built indexes keyed by name and the version of the data they came from.
+
+    A new version is built next to the one being served, so readers still
+    on the old version (while a reload is in progress) keep hitting it;
+    older versions are dropped once the newest one is read. Reads take no
+    lock, builds are serialized. A `build` returning None is not cached.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _find(self, name, version):
+        versions = self._entries.get(name, ())
+        for position, (cached_version, value) in enumerate(versions):
+            if cached_version == version:
+                return position, len(versions), value
+        return None
+
+    def get(self, name, version, build, *args):
+        found = self._find(name, version)
+        if found is None:
+            with self._lock:
+                found = self._find(name, version)
+                if found is None:
+                    value = build(*args)
+                    if value is not None:
+                        # Keep only the newest other version alongside the new one
+                        older = [entry for entry in self._entries.get(name, ()) if entry[0] != version][-1:]
+                        self._entries[name] = older + [(version, value)]
+                    return value
+
+        position, count, value = found
+        if 0 < position == count - 1 and self._lock.acquire(blocking=False):
+            try:
+                self._entries[name] = [entry for entry in self._entries[name] if entry[0] == version]
+            finally:
+                self._lock.release()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return sum(len(versions) for versions in self._entries.values())
@@ -0,0 +1,89 @@
+/**
+ * Course suggestions computed in the browser from the server's alias dictionary.
+ *
+ * The dictionary URL carries a hash of its content, so the browser downloads
+ * it once and keeps it. Queries with no local suggestions fall back to the
+ * server's /autocomplete.
+ */
+class AliasDictionary {
+    static MAX_SUGGESTIONS = 20;
+    // Share of the query's character trigrams an alias must contain to count as a fuzzy match
+    static FUZZY_THRESHOLD = 0.6;
+    static FUZZY_MIN_LENGTH = 4;
+
+    static async load(url) {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Unable to load ${url}: ${response.status}`);
+        return new AliasDictionary(await response.json());
+    }
+
+    constructor(data) {
+        this.courses = data.courses;
+        this.departments = data.departments;
+        this.r2024FirstJoinYear = data.r2024_first_join_year;
+        this.entries = data.aliases.map(([alias, courses]) => {
+            const normalized = AliasDictionary.normalize(alias);
+            return { normalized, words: normalized.split(" "), courses, trigrams: null };
+        });
+    }
+
+    /** Lower-case with runs of non-word characters collapsed to one space, as the server normalizes. */
+    static normalize(text) {
+        return text.toLowerCase().replace(/[^\p{L}\p{N}_]+/gu, " ").trim();
+    }
+
+    static trigrams(text) {
+        const padded = ` ${text} `;
+        const trigrams = new Set();
+        for (let i = 0; i + 3 <= padded.length; i++) trigrams.add(padded.slice(i, i + 3));
+        return trigrams;
+    }
+
+    /**
+     * Course names for a query, best first: aliases starting with the query,
+     * then those with a word starting with each query word, then fuzzy
+     * matches. Courses of the student's department come first.
+     */
+    suggest(query, regNo) {
+        const normalized = AliasDictionary.normalize(query);
+        if (!normalized) return [];
+        const words = normalized.split(" ");
+        const queryTrigrams = normalized.length >= AliasDictionary.FUZZY_MIN_LENGTH
+            ? AliasDictionary.trigrams(normalized) : null;
+
+        const matches = [];
+        for (const entry of this.entries) {
+            let score = 0;
+            if (entry.normalized.startsWith(normalized)) {
+                score = 3;
+            } else if (words.every((word) => entry.words.some((part) => part.startsWith(word)))) {
+                score = 2;
+            } else if (queryTrigrams) {
+                entry.trigrams = entry.trigrams || AliasDictionary.trigrams(entry.normalized);
+                let shared = 0;
+                for (const trigram of queryTrigrams) if (entry.trigrams.has(trigram)) shared += 1;
+                const containment = shared / queryTrigrams.size;
+                if (containment >= AliasDictionary.FUZZY_THRESHOLD) score = containment;
+            }
+            if (score > 0) matches.push([score, entry]);
+        }
+        matches.sort((a, b) => b[0] - a[0]);
+
+        // A Set keeps each course at its best-ranked position
+        const positions = new Set();
+        for (const [, entry] of matches) entry.courses.forEach((position) => positions.add(position));
+        const ownCourses = new Set(this.departmentCourses(regNo));
+        return [...positions]
+            .sort((a, b) => ownCourses.has(b) - ownCourses.has(a))
+            .slice(0, AliasDictionary.MAX_SUGGESTIONS)
+            .map((position) => this.courses[position]);
+    }
+
+    /** Positions of the courses on the eligibility sheet of the student's department and regulation. */
+    departmentCourses(regNo) {
+        const department = this.departments[regNo.slice(6, 8)];
+        if (!department) return [];
+        const regulation = Number(regNo.slice(4, 6)) < this.r2024FirstJoinYear ? "R2019" : "R2024";
+        return department[regulation] || [];
+    }
+}
@@ -0,0 +1,35 @@
+/**
+ * POST a JSON query, revalidating a response kept from an earlier identical query.
+ *
+ * The server tags query responses with an ETag; when the same body is sent
+ * again with that ETag, it answers 304 and the kept response is reused.
+ * Resolves to a Response either way, so callers treat it like fetch().
+ */
+async function cachedPost(url, payload) {
+    const body = JSON.stringify(payload);
+    const key = `cachedPost:${url}:${body}`;
+    let kept = null;
+    try {
+        kept = JSON.parse(sessionStorage.getItem(key));
+    } catch (error) {
+        // Storage unavailable; fall through to a plain request
+    }
+
+    const headers = { "Content-Type": "application/json" };
+    if (kept) headers["If-None-Match"] = kept.etag;
+    const response = await fetch(url, { method: "POST", headers, body });
+
+    if (response.status === 304 && kept) {
+        return new Response(kept.body, { status: 200, headers: { "Content-Type": "application/json" } });
+    }
+    const etag = response.headers.get("ETag");
+    if (response.ok && etag) {
+        const text = await response.clone().text();
+        try {
+            sessionStorage.setItem(key, JSON.stringify({ etag, body: text }));
+        } catch (error) {
+            // Storage full or unavailable; the response is still returned
+        }
+    }
+    return response;
+}
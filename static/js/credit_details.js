@@ -47,13 +47,7 @@ function fetchCreditDetails() {
         return;
     }
 
-    fetch("/credit_details", {
-        method: "POST",
-        headers: {
-            "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ reg_no: reg_no }),
-    })
+    cachedPost("/credit_details", { reg_no: reg_no })
     .then(response => response.json())
     .then(data => {
         if (data.error) {
@@ -150,13 +144,7 @@ function fetchCompletedCourses(reg_no, categoryAbbr) {
         return;
     }
 
-    fetch("/get_completed_courses", {
-        method: "POST",
-        headers: {
-            "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ reg_no: reg_no, category: categoryAbbr }),
-    })
+    cachedPost("/get_completed_courses", { reg_no: reg_no, category: categoryAbbr })
     .then(response => response.json())
     .then(data => {
         if (data.error) {
@@ -12,6 +12,19 @@ document.addEventListener("DOMContentLoaded", () => {
     let typingTimer;
     const delay = 500; // Delay for debounce
 
+    // Autocomplete requests are numbered per page so the server can drop superseded ones
+    const clientId = Math.random().toString(36).slice(2);
+    let autocompleteSeq = 0;
+    let autocompleteController = null;
+
+    // Suggestions come from the alias dictionary once it has loaded, and from the server otherwise
+    let aliasDictionary = null;
+    if (courseNameInput.dataset.aliasDictionary) {
+        AliasDictionary.load(courseNameInput.dataset.aliasDictionary)
+            .then((dictionary) => { aliasDictionary = dictionary; })
+            .catch((error) => console.error("Alias dictionary load error:", error));
+    }
+
     /**
      * Fetch student and course details
      */
@@ -21,11 +34,7 @@ document.addEventListener("DOMContentLoaded", () => {
                 ? { reg_no: regNo, course_name: courseName }
                 : { reg_no: regNo };
 
-            const response = await fetch("/online_courses", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify(requestBody),
-            });
+            const response = await cachedPost("/online_courses", requestBody);
             const data = await response.json();
             
             if (!response.ok) throw new Error(data.error || "Unknown error");
@@ -48,11 +57,18 @@ document.addEventListener("DOMContentLoaded", () => {
      * Fetch autocomplete suggestions for course names
      */
     const fetchAutocompleteSuggestions = async (regNo, query) => {
+        // Abort the previous keystroke's request; only the newest result is shown
+        if (autocompleteController) autocompleteController.abort();
+        autocompleteController = new AbortController();
+        autocompleteSeq += 1;
+
         try {
-            const response = await fetch(`/autocomplete?reg_no=${regNo}&query=${query}`);
+            const params = new URLSearchParams({ reg_no: regNo, query, client_id: clientId, seq: autocompleteSeq });
+            const response = await fetch(`/autocomplete?${params}`, { signal: autocompleteController.signal });
             const data = await response.json();
     
             if (!response.ok) throw new Error("Failed to fetch autocomplete suggestions");
+            if (data.cancelled) return;
     
             if (data.suggestions && data.suggestions.length > 0) {
                 displaySuggestions(data.suggestions, query);
@@ -61,6 +77,7 @@ document.addEventListener("DOMContentLoaded", () => {
                 suggestionsList.classList.add("hidden");
             }
         } catch (error) {
+            if (error.name === "AbortError") return;
             console.error("Autocomplete fetch error:", error);
         }
     };    
@@ -160,7 +177,16 @@ document.addEventListener("DOMContentLoaded", () => {
     courseNameInput.addEventListener("input", () => {
         const regNo = regNoInput.value.trim();
         const query = courseNameInput.value.trim();
-        if (/^\d{12}$/.test(regNo) && query) fetchAutocompleteSuggestions(regNo, query);
+        if (!/^\d{12}$/.test(regNo) || !query) return;
+
+        const suggestions = aliasDictionary ? aliasDictionary.suggest(query, regNo) : [];
+        if (suggestions.length > 0) {
+            // A server request for an earlier keystroke must not overwrite these
+            if (autocompleteController) autocompleteController.abort();
+            displaySuggestions(suggestions, query);
+        } else {
+            fetchAutocompleteSuggestions(regNo, query);
+        }
     });
 
     suggestionsList.addEventListener("click", (event) => {
@@ -0,0 +1,109 @@
+"""fuzzy_match against scores recorded from fuzzywuzzy 0.18.0 (python-Levenshtein 0.26.1).
+
+Eligibility and autocomplete hinge on these numbers crossing fixed
+thresholds, so a RapidFuzz upgrade that shifts any of them fails here.
+"""
+import pytest
+from fuzzy_match import ChoiceSet, WRatio, full_process, partial_ratio, ratio
+
+# (s1, s2, fuzz.ratio, fuzz.partial_ratio, fuzz.WRatio)
+PAIRS = [
+    ("", "", 100, 100, 0),
+    ("a", "", 0, 0, 0),
+    ("a", "a", 100, 100, 100),
+    ("a", "ab", 67, 100, 90),
+    ("ab", "ba", 50, 67, 50),
+    ("ml", "ML", 0, 0, 100),
+    # Length ratio above 8: partial scores scaled by 0.6
+    ("AI", "Artificial Intelligence", 16, 50, 30),
+    ("data", "Introduction to Data Science and Analytics for Engineers", 13, 75, 60),
+    ("IoT", "Introduction to Internet of Things", 16, 33, 40),
+    # Length ratio from 1.5 to 8: partial scores scaled by 0.9
+    ("python", "Programming in Python", 37, 83, 90),
+    ("machine learning", "Introduction to Machine Learning", 58, 88, 90),
+    ("Soft Skills", "Developing Soft Skills and Personality", 45, 100, 90),
+    # Length ratio below 1.5: token sort/set scores scaled by 0.95
+    ("Machine Learning", "Learning Machine", 50, 50, 95),
+    ("deep learning neural networks", "Neural Networks and Deep Learning", 42, 45, 95),
+    ("the joy of computing using python", "joy of computing using python the", 88, 88, 95),
+    ("Digital Circuits", "Digital Circuit Design", 84, 94, 84),
+    ("Cloud Computing!!", "cloud-computing", 75, 80, 100),
+    # force_ascii drops Latin-1 letters but keeps other scripts
+    ("Café Économie", "Cafe Economie", 85, 85, 92),
+    ("Résumé Writing", "Resume Writing", 86, 86, 92),
+    ("தமிழர் மரபு", "தமிழர் மரபு (Heritage of Tamils)", 51, 100, 90),
+    ("Heritage of Tamils", "தமிழர் மரபு", 7, 9, 19),
+]
+
+# (s, utils.full_process(s), utils.full_process(s, force_ascii=True))
+PROCESSED = [
+    ("Café Économie!", "café économie", "caf conomie"),
+    ("தமிழர் மரபு", "தம ழர  மரப", "தம ழர  மரப"),
+    ("  Data--Science  ", "data  science", "data  science"),
+]
+
+CHOICES = [
+    "Programming in Python", "Python for Data Science", "Data Science for Engineers",
+    "Introduction to Machine Learning", "Machine Learning for Engineering and Science Applications",
+    "Deep Learning", "Cloud Computing", "Café Économie", "Introduction to Internet of Things",
+    "Joy of Computing using Python",
+]
+
+# process.extract(query, CHOICES, limit=5, scorer=fuzz.partial_ratio), scores above 60 kept
+EXTRACTED = [
+    ("python", [("Programming in Python", 100), ("Python for Data Science", 100),
+                ("Joy of Computing using Python", 100)]),
+    ("data sci", [("Python for Data Science", 100), ("Data Science for Engineers", 100),
+                  ("Machine Learning for Engineering and Science Applications", 62)]),
+    ("machine", [("Introduction to Machine Learning", 100),
+                 ("Machine Learning for Engineering and Science Applications", 100)]),
+    ("learning deep", [("Deep Learning", 76), ("Machine Learning for Engineering and Science Applications", 69),
+                       ("Introduction to Machine Learning", 62)]),
+    ("cafe", [("Café Économie", 75)]),
+    ("iot", [("Introduction to Machine Learning", 67), ("Introduction to Internet of Things", 67)]),
+    ("computing", [("Cloud Computing", 100), ("Joy of Computing using Python", 100)]),
+    ("xyz", []),
+]
+
+# process.extractOne(query, CHOICES)[1]
+BEST = [
+    ("Python Programming", 95),
+    ("data science engineers", 95),
+    ("Deep Learnin", 96),
+    ("Café Economie", 96),
+    ("Internet of Things", 90),
+    ("Cooking", 55),
+]
+
+
+@pytest.mark.parametrize("s1, s2, expected, _partial, _wratio", PAIRS)
+def test_ratio(s1, s2, expected, _partial, _wratio):
+    assert ratio(s1, s2) == expected
+
+
+@pytest.mark.parametrize("s1, s2, _ratio, expected, _wratio", PAIRS)
+def test_partial_ratio(s1, s2, _ratio, expected, _wratio):
+    assert partial_ratio(s1, s2) == expected
+
+
+@pytest.mark.parametrize("s1, s2, _ratio, _partial, expected", PAIRS)
+def test_wratio(s1, s2, _ratio, _partial, expected):
+    assert WRatio(full_process(s1, force_ascii=True), full_process(s2, force_ascii=True)) == expected
+
+
+@pytest.mark.parametrize("s, expected, expected_ascii", PROCESSED)
+def test_full_process(s, expected, expected_ascii):
+    assert full_process(s) == expected
+    assert full_process(s, force_ascii=True) == expected_ascii
+
+
+@pytest.mark.parametrize("query, expected", EXTRACTED)
+def test_extract(query, expected):
+    assert ChoiceSet(CHOICES).extract(query, limit=5, threshold=60) == expected
+
+
+def test_best_wratio():
+    queries = [query for query, _ in BEST]
+    choices = ChoiceSet(CHOICES, force_ascii=True)
+    assert choices.best_wratio(queries, 0) == [score for _, score in BEST]
+    assert choices.best_wratio(queries, 60) == [score if score >= 60 else None for _, score in BEST]
@@ -0,0 +1,158 @@
+"""Parse many worksheets at once across a pool of processes.
+
+Opening an .xlsx file (its shared strings and styles) costs about as much
+as parsing a sheet of it, so each task parses a batch of sheets from one
+workbook opened once. A workbook's sheets are spread over as many batches
+as there are workers, so wall-clock time shrinks with the number of cores.
+
+Workers are spawned as fresh interpreters, never forked from the caller:
+reloads run on a watcher thread inside a multi-threaded worker, where
+forking could copy a lock another thread holds. Spawning also leaves no
+server process behind, like a forkserver would, for gunicorn's forked
+workers to inherit and fail to reach.
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import click
+
+log = logging.getLogger(__name__)
+
+# Processes parsing workbooks in parallel (1 parses in the calling process);
+# gunicorn workers split them between themselves (see share_workers)
+DATA_LOAD_WORKERS = int(os.environ.get("DATA_LOAD_WORKERS", str(os.cpu_count() or 1)))
+
+
+def share_workers(processes):
+    """Give this process its share of DATA_LOAD_WORKERS among `processes` siblings.
+
+    Every gunicorn worker reloads changed workbooks on its own, so without
+    this each of them could start a full-size pool at the same moment.
+    """
+    global DATA_LOAD_WORKERS
+    DATA_LOAD_WORKERS = max(1, DATA_LOAD_WORKERS // processes)
+
+
+def _column_key(name):
+    return " ".join(str(name).split()).upper()
+
+
+def column_filter(usecols):
+    """A pandas `usecols` callable keeping the columns named in `usecols`, matched ignoring case and spacing.
+
+    None (every column) when `usecols` is None.
+    """
+    if usecols is None:
+        return None
+    wanted = {_column_key(name) for name in usecols}
+    return lambda column: _column_key(column) in wanted
+
+
+def select_columns(df, usecols):
+    """The columns of `df` named in `usecols`, as column_filter matches them; every column when it's None.
+
+    Columns keep the sheet's own names and order.
+    """
+    keep = column_filter(usecols)
+    if keep is None:
+        return df
+    return df.loc[:, [keep(column) for column in df.columns]]
+
+
+def parse_batch(path, sheets):
+    """Parse (sheet, header, usecols) requests of one workbook, opening it once.
+
+    Only the columns in `usecols` are built into the frame, but pandas'
+    openpyxl reader still reads every cell of a row, so this saves memory
+    more than parsing time. Dtypes are left as pandas infers them: the
+    indexes normalize the values they use, and coercing here would change
+    the frames they read.
+
+    Returns (sheet, header, usecols, frame or ValueError, seconds, pid) per
+    request, a missing sheet giving the ValueError pd.read_excel would raise.
+    """
+    import pandas as pd
+
+    results = []
+    with pd.ExcelFile(path) as workbook:
+        for sheet_name, header, usecols in sheets:
+            started = time.perf_counter()
+            try:
+                result = workbook.parse(sheet_name, header=header, usecols=column_filter(usecols))
+            except ValueError as e:
+                result = e
+            results.append((sheet_name, header, usecols, result, time.perf_counter() - started, os.getpid()))
+    return results
+
+
+def _batches(sheets, workers):
+    """Split {path: [(sheet, header, usecols)]} into (path, sheets) tasks, up to `workers` per workbook."""
+    tasks = []
+    for path, pairs in sheets.items():
+        count = max(1, min(workers, len(pairs)))
+        tasks.extend((path, pairs[start::count]) for start in range(count))
+    return tasks
+
+
+def _pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def parse_sheets(requests, workers=None):
+    """Parse (path, sheet, header, usecols) requests from .xlsx files, in parallel when `workers` > 1.
+
+    Returns ({request: frame or ValueError}, report), the report holding
+    one dict per sheet with its file, sheet, rows, columns, parse seconds
+    and the process that parsed it.
+    """
+    workers = DATA_LOAD_WORKERS if workers is None else workers
+    sheets = {}
+    for path, sheet_name, header, usecols in dict.fromkeys(requests):
+        sheets.setdefault(path, []).append((sheet_name, header, usecols))
+
+    tasks = _batches(sheets, workers)
+    if workers > 1 and len(tasks) > 1:
+        with _pool(min(workers, len(tasks))) as pool:
+            batches = list(pool.map(parse_batch, *zip(*tasks)))
+    else:
+        batches = [parse_batch(path, pairs) for path, pairs in tasks]
+
+    results, report = {}, []
+    for (path, _), batch in zip(tasks, batches):
+        for sheet_name, header, usecols, result, seconds, pid in batch:
+            results[(path, sheet_name, header, usecols)] = result
+            parsed = not isinstance(result, Exception)
+            report.append({
+                "file": os.path.basename(path),
+                "sheet": sheet_name,
+                "rows": len(result) if parsed else None,
+                "columns": len(result.columns) if parsed else None,
+                "seconds": seconds,
+                "pid": pid,
+            })
+    return results, report
+
+
+def format_report(report, wall_seconds):
+    """The per-sheet timing report as a text table, slowest sheet first."""
+    lines = [f"{'seconds':>8} {'rows':>6} {'cols':>5} {'pid':>7}  file / sheet"]
+    for entry in sorted(report, key=lambda entry: entry["seconds"], reverse=True):
+        rows = "-" if entry["rows"] is None else entry["rows"]
+        columns = "-" if entry["columns"] is None else entry["columns"]
+        lines.append(f"{entry['seconds']:8.3f} {rows:>6} {columns:>5} {entry['pid']:>7}  {entry['file']} / {entry['sheet']}")
+    parse_seconds = sum(entry["seconds"] for entry in report)
+    lines.append(f"{len(report)} sheets: {parse_seconds:.2f}s of parsing in {wall_seconds:.2f}s wall-clock")
+    return "\n".join(lines)
+
+
+@click.command("load-report")
+@click.option("--workers", type=int, default=None, help="Parsing processes (default: DATA_LOAD_WORKERS).")
+def load_report_command(workers):
+    """Parse every watched sheet from its .xlsx file and print what each one cost."""
+    import data_reload
+
+    started = time.perf_counter()
+    _, report = parse_sheets(data_reload.watched_sheets(), workers)
+    click.echo(format_report(report, time.perf_counter() - started))